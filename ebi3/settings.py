@@ -211,6 +211,8 @@ DEEPSEEK_CONFIG = {
     'TIMEOUT': 30,
     'TEMPERATURE': 0.1,
     'MAX_TOKENS': 4000,
+    # Mémoire de traduction écrite par Celery plutôt que pendant la requête
+    'ASYNC_MEMORY_WRITES': True,
 }
 
 # Middleware pour la traduction
@@ -12,10 +12,12 @@ if not DEBUG:
     # Cache pour la production
     CACHES = {
         'default': {
-            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'BACKEND': 'django_redis.cache.RedisCache',
             'LOCATION': os.environ.get('REDIS_URL', 'redis://localhost:6379/1'),
             'OPTIONS': {
                 'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                # redis-py utilise le parseur C hiredis dès qu'il est installé
+                'CONNECTION_POOL_KWARGS': {'max_connections': 64},
             }
         }
     }
\ No newline at end of file
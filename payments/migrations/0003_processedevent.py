@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProcessedEvent",
+            fields=[
+                (
+                    "event_hash",
+                    models.CharField(
+                        max_length=64,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Identifiant de l'événement",
+                    ),
+                ),
+                (
+                    "gateway",
+                    models.CharField(max_length=20, verbose_name="Passerelle"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Événement traité",
+                "verbose_name_plural": "Événements traités",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
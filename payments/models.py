@@ -1940,4 +1940,31 @@ class Currency(models.Model):
         ordering = ['display_order', 'code']
 
     def __str__(self):
-        return f"{self.code} - {self.name}"
\ No newline at end of file
+        return f"{self.code} - {self.name}"
+
+
+# ============================================================================
+# NOUVEAU MODÈLE : ProcessedEvent (idempotence des webhooks)
+# ============================================================================
+
+class ProcessedEvent(models.Model):
+    """Événement webhook déjà reçu, pour ignorer les réessais des passerelles"""
+
+    event_hash = models.CharField(
+        max_length=64,
+        primary_key=True,
+        verbose_name=_("Identifiant de l'événement")
+    )
+    gateway = models.CharField(
+        max_length=20,
+        verbose_name=_("Passerelle")
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Événement traité")
+        verbose_name_plural = _("Événements traités")
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.gateway} - {self.event_hash}"
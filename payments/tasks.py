@@ -8,7 +8,7 @@ from django.utils.translation import gettext_lazy as _
 import logging
 from datetime import timedelta
 
-from .models import Transaction, Invoice
+from .models import PaymentTransaction, Invoice
 from .utils import generate_invoice_pdf
 
 logger = logging.getLogger(__name__)
@@ -22,7 +22,7 @@ def process_pending_transactions():
     try:
         # Transactions en attente depuis plus de 30 minutes
         cutoff_time = timezone.now() - timedelta(minutes=30)
-        pending_transactions = Transaction.objects.filter(
+        pending_transactions = PaymentTransaction.objects.filter(
             status='PENDING',
             created_at__lt=cutoff_time
         ).exclude(payment_method__in=['CASH', 'BANK_TRANSFER'])
@@ -69,7 +69,7 @@ def notify_transaction_created(transaction_id):
     Envoyer une notification par email lorsqu'une transaction est créée
     """
     try:
-        transaction = Transaction.objects.get(id=transaction_id)
+        transaction = PaymentTransaction.objects.get(id=transaction_id)
 
         context = {
             'transaction': transaction,
@@ -120,7 +120,7 @@ def notify_transaction_created(transaction_id):
         logger.info(f"Notification sent for transaction {transaction.id}")
         return True
 
-    except Transaction.DoesNotExist:
+    except PaymentTransaction.DoesNotExist:
         logger.error(f"Transaction with id {transaction_id} does not exist")
         return False
     except Exception as e:
@@ -133,7 +133,7 @@ def notify_transaction_completed(transaction_id):
     Envoyer une notification par email lorsqu'une transaction est complétée
     """
     try:
-        transaction = Transaction.objects.get(id=transaction_id)
+        transaction = PaymentTransaction.objects.get(id=transaction_id)
 
         context = {
             'transaction': transaction,
@@ -181,7 +181,7 @@ def notify_transaction_completed(transaction_id):
         logger.info(f"Completion notification sent for transaction {transaction.id}")
         return True
 
-    except Transaction.DoesNotExist:
+    except PaymentTransaction.DoesNotExist:
         logger.error(f"Transaction with id {transaction_id} does not exist")
         return False
     except Exception as e:
@@ -194,7 +194,7 @@ def notify_transaction_expired(transaction_id):
     Envoyer une notification par email lorsqu'une transaction a expiré
     """
     try:
-        transaction = Transaction.objects.get(id=transaction_id)
+        transaction = PaymentTransaction.objects.get(id=transaction_id)
 
         context = {
             'transaction': transaction,
@@ -225,7 +225,7 @@ def notify_transaction_expired(transaction_id):
         logger.info(f"Expiration notification sent for transaction {transaction.id}")
         return True
 
-    except Transaction.DoesNotExist:
+    except PaymentTransaction.DoesNotExist:
         logger.error(f"Transaction with id {transaction_id} does not exist")
         return False
     except Exception as e:
@@ -327,9 +327,9 @@ def process_recurring_payments():
         for subscription in subscriptions:
             try:
                 # Créer une nouvelle transaction
-                from .models import Transaction
+                from .models import PaymentTransaction
 
-                transaction = Transaction.objects.create(
+                transaction = PaymentTransaction.objects.create(
                     user=subscription.user,
                     amount=subscription.plan.price,
                     currency=subscription.plan.currency,
@@ -369,7 +369,7 @@ def retry_failed_payment(self, transaction_id):
     Réessayer un paiement échoué
     """
     try:
-        transaction = Transaction.objects.get(id=transaction_id)
+        transaction = PaymentTransaction.objects.get(id=transaction_id)
 
         if transaction.status != 'FAILED':
             return "Transaction not in FAILED status"
@@ -384,10 +384,38 @@ def retry_failed_payment(self, transaction_id):
         logger.info(f"Retried failed payment for transaction {transaction.id}")
         return True
 
-    except Transaction.DoesNotExist:
+    except PaymentTransaction.DoesNotExist:
         logger.error(f"Transaction with id {transaction_id} does not exist")
         return False
     except Exception as exc:
         logger.error(f"Error retrying payment: {str(exc)}")
         self.retry(countdown=60 * (2 ** self.request.retries), exc=exc)
-        raise
\ No newline at end of file
+        raise
+
+@shared_task(bind=True, max_retries=3)
+def process_stripe_event(self, event, event_key):
+    """
+    Traiter un événement webhook Stripe (déjà vérifié) en arrière-plan
+    """
+    from .webhooks import StripeWebhookHandler, get_webhook_handler
+
+    try:
+        return get_webhook_handler(StripeWebhookHandler).process(event, event_key)
+
+    except Exception as exc:
+        logger.error(f"Error processing Stripe event {event.get('id')}: {str(exc)}")
+        self.retry(countdown=60 * (2 ** self.request.retries), exc=exc)
+
+@shared_task(bind=True, max_retries=3)
+def process_paypal_event(self, event, event_key):
+    """
+    Traiter un événement webhook PayPal (déjà vérifié) en arrière-plan
+    """
+    from .webhooks import PayPalWebhookHandler, get_webhook_handler
+
+    try:
+        return get_webhook_handler(PayPalWebhookHandler).process(event, event_key)
+
+    except Exception as exc:
+        logger.error(f"Error processing PayPal event {event.get('id')}: {str(exc)}")
+        self.retry(countdown=60 * (2 ** self.request.retries), exc=exc)
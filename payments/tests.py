@@ -4,13 +4,17 @@ from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
 from datetime import timedelta
+from unittest.mock import patch
 import json
 
 from .models import (
-    Transaction, PaymentSession, Invoice, Refund,
-    PaymentMethod, Subscription, Plan, Coupon, TaxRate
+    PaymentTransaction, PaymentSession, Invoice, Refund,
+    PaymentMethod, Subscription, Plan, Coupon,
+    ProcessedEvent
 )
+from .webhooks import WebhookHandler
 
 User = get_user_model()
 
@@ -35,7 +39,7 @@ class PaymentModelsTests(TestCase):
 
     def test_transaction_creation(self):
         """Test la création d'une transaction"""
-        transaction = Transaction.objects.create(
+        transaction = PaymentTransaction.objects.create(
             user=self.user,
             amount=100.00,
             currency='EUR',
@@ -51,7 +55,7 @@ class PaymentModelsTests(TestCase):
 
     def test_invoice_generation(self):
         """Test la génération d'une facture"""
-        transaction = Transaction.objects.create(
+        transaction = PaymentTransaction.objects.create(
             user=self.user,
             amount=150.00,
             currency='EUR',
@@ -84,7 +88,7 @@ class PaymentModelsTests(TestCase):
 
     def test_refund_creation(self):
         """Test la création d'un remboursement"""
-        transaction = Transaction.objects.create(
+        transaction = PaymentTransaction.objects.create(
             user=self.user,
             amount=200.00,
             currency='EUR',
@@ -132,6 +136,50 @@ class PaymentModelsTests(TestCase):
         self.assertEqual(subscription.plan.name, 'Plan Test')
         self.assertTrue(subscription.is_active())
 
+    def test_processed_event_uniqueness(self):
+        """Test qu'un événement webhook ne peut être enregistré qu'une fois"""
+        ProcessedEvent.objects.create(event_hash='evt_test_123', gateway='stripe')
+
+        with self.assertRaises(IntegrityError):
+            ProcessedEvent.objects.create(event_hash='evt_test_123', gateway='stripe')
+
+
+class RecordingWebhookHandler(WebhookHandler):
+    """Gestionnaire de test : enregistre les événements traités, sans passerelle"""
+
+    def __init__(self):
+        self.backend_name = 'test'
+        self.handled = []
+
+    def handle_event(self, event):
+        self.handled.append(event)
+        return {'status': 'handled'}
+
+
+class WebhookDeduplicationTests(TestCase):
+    """Tests du dédoublonnage des webhooks"""
+
+    def test_duplicate_event_handled_once(self):
+        """Test qu'un événement reçu deux fois n'est traité qu'une fois"""
+        handler = RecordingWebhookHandler()
+        event = {'id': 'evt_test_456', 'type': 'payment_intent.succeeded'}
+
+        self.assertEqual(handler.process(event, 'evt_test_456'), {'status': 'handled'})
+        self.assertEqual(handler.process(event, 'evt_test_456'), {'status': 'duplicate'})
+        self.assertEqual(handler.handled, [event])
+
+    def test_failed_event_not_recorded(self):
+        """Test qu'un traitement en échec laisse l'événement rejouable"""
+        handler = RecordingWebhookHandler()
+        event = {'id': 'evt_test_789', 'type': 'payment_intent.succeeded'}
+
+        with patch.object(handler, 'handle_event', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                handler.process(event, 'evt_test_789')
+
+        self.assertFalse(ProcessedEvent.objects.filter(pk='evt_test_789').exists())
+        self.assertEqual(handler.process(event, 'evt_test_789'), {'status': 'handled'})
+
 
 class PaymentViewsTests(TestCase):
     """Tests pour les vues de paiement"""
@@ -145,7 +193,7 @@ class PaymentViewsTests(TestCase):
         )
         self.client.login(username='testuser', password='testpass123')
 
-        self.transaction = Transaction.objects.create(
+        self.transaction = PaymentTransaction.objects.create(
             user=self.user,
             amount=100.00,
             currency='EUR',
@@ -223,7 +271,7 @@ class PaymentFormsTests(TestCase):
             password='testpass123'
         )
 
-        self.transaction = Transaction.objects.create(
+        self.transaction = PaymentTransaction.objects.create(
             user=self.user,
             amount=100.00,
             currency='EUR',
@@ -361,7 +409,7 @@ class PaymentIntegrationTests(TestCase):
         Test un flux complet de remboursement
         """
         # Créer une transaction complétée
-        transaction = Transaction.objects.create(
+        transaction = PaymentTransaction.objects.create(
             user=self.user,
             amount=100.00,
             currency='EUR',
@@ -441,7 +489,7 @@ class PaymentSecurityTests(TestCase):
         """Test la protection contre les attaques XSS"""
         malicious_input = '<script>alert("XSS")</script>'
 
-        transaction = Transaction.objects.create(
+        transaction = PaymentTransaction.objects.create(
             user=self.user,
             amount=100.00,
             currency='EUR',
@@ -463,7 +511,7 @@ class PaymentSecurityTests(TestCase):
         suspicious_input = "100.00'; DROP TABLE payments_transaction; --"
 
         try:
-            transaction = Transaction.objects.create(
+            transaction = PaymentTransaction.objects.create(
                 user=self.user,
                 amount=suspicious_input,  # Ce champ est un DecimalField, donc converti
                 currency='EUR',
@@ -472,7 +520,7 @@ class PaymentSecurityTests(TestCase):
 
             # Si on arrive ici, l'entrée a été validée
             # Vérifier que la table existe toujours
-            count = Transaction.objects.count()
+            count = PaymentTransaction.objects.count()
             self.assertGreaterEqual(count, 1)
 
         except Exception:
@@ -487,7 +535,7 @@ class PaymentPerformanceTests(TestCase):
         """Test les performances de la liste des transactions"""
         # Créer 100 transactions
         for i in range(100):
-            Transaction.objects.create(
+            PaymentTransaction.objects.create(
                 user=self.user,
                 amount=i + 1.00,
                 currency='EUR',
@@ -512,7 +560,7 @@ class PaymentPerformanceTests(TestCase):
         """Test les opérations en masse"""
         # Créer 1000 transactions en une requête (bulk_create)
         transactions = [
-            Transaction(
+            PaymentTransaction(
                 user=self.user,
                 amount=i + 1.00,
                 currency='EUR',
@@ -521,8 +569,8 @@ class PaymentPerformanceTests(TestCase):
             for i in range(1000)
         ]
 
-        Transaction.objects.bulk_create(transactions)
+        PaymentTransaction.objects.bulk_create(transactions)
 
         # Vérifier le compte
-        count = Transaction.objects.count()
+        count = PaymentTransaction.objects.count()
         self.assertEqual(count, 1000)
\ No newline at end of file
@@ -7,6 +7,8 @@ import logging
 import json
 import hmac
 import hashlib
+import time
+from decimal import Decimal
 from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
@@ -14,60 +16,177 @@ from django.utils.decorators import method_decorator
 from django.views import View
 from django.conf import settings
 from django.utils import timezone
-from django.db import transaction
+from django.db import transaction, IntegrityError
+from celery import group
 
 from .exceptions import WebhookVerificationError
-from .models import Transaction, Invoice, Refund, Subscription
+from .models import PaymentTransaction, Invoice, Refund, Subscription, ProcessedEvent
 from .backends import PaymentBackendFactory
 from .tasks import (
     notify_transaction_completed,
     generate_invoice_pdf_task,
-    send_invoice_email
+    send_invoice_email,
+    process_stripe_event,
+    process_paypal_event
 )
 
 logger = logging.getLogger(__name__)
 
+# orjson est plus rapide que json et lit directement les bytes
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def loads_payload(payload):
+    """Décoder le corps JSON d'un webhook"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+# Backends et gestionnaires sans état, partagés entre les requêtes
+_BACKEND_CACHE = {}
+_HANDLER_CACHE = {}
+
+
+def get_webhook_handler(handler_class):
+    """Obtenir l'instance partagée d'un gestionnaire de webhook"""
+    handler = _HANDLER_CACHE.get(handler_class)
+    if handler is None:
+        handler = _HANDLER_CACHE[handler_class] = handler_class()
+    return handler
+
 
 class WebhookHandler:
     """Gestionnaire de base pour les webhooks"""
 
+    # Tâche Celery chargée du traitement différé (None = traitement synchrone)
+    task = None
+
     def __init__(self, backend_name):
         self.backend_name = backend_name
-        self.backend = PaymentBackendFactory.get_backend(backend_name)
+
+        backend = _BACKEND_CACHE.get(backend_name)
+        if backend is None:
+            backend = _BACKEND_CACHE[backend_name] = PaymentBackendFactory.get_backend(backend_name)
+        self.backend = backend
 
     def verify_signature(self, payload, signature, headers=None):
-        """Vérifier la signature du webhook"""
+        """Vérifier la signature du webhook (payload : corps brut en bytes)"""
         raise NotImplementedError
 
     def handle_event(self, event):
         """Traiter un événement de webhook"""
         raise NotImplementedError
 
+    def get_event_key(self, event, payload):
+        """Clé d'idempotence : empreinte BLAKE2b du contenu brut"""
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def is_processed(self, event_key):
+        """Indiquer si l'événement a déjà été traité avec succès"""
+        return ProcessedEvent.objects.filter(pk=event_key).exists()
+
+    def process(self, event, event_key):
+        """
+        Traiter un événement une seule fois.
+
+        L'enregistrement de l'événement et son traitement partagent la même
+        transaction : en cas d'échec, la ligne ProcessedEvent est annulée et
+        le réessai (Celery ou passerelle) retraite l'événement.
+        """
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    ProcessedEvent.objects.create(
+                        event_hash=event_key,
+                        gateway=self.backend_name
+                    )
+            except IntegrityError:
+                logger.info("Duplicate webhook ignored: %s %s", self.backend_name, event_key)
+                return {'status': 'duplicate'}
+
+            return self.handle_event(event)
+
+    def enqueue(self, event, event_key):
+        """Planifier le traitement d'un événement vérifié"""
+        if self.task is None:
+            return self.process(event, event_key)
+
+        self.task.delay(event, event_key)
+        return {'status': 'queued', 'event_id': event.get('id')}
+
 
 class StripeWebhookHandler(WebhookHandler):
     """Gestionnaire de webhooks Stripe"""
 
+    task = process_stripe_event
+
+    # Âge maximal accepté pour l'horodatage signé (même règle que le SDK)
+    signature_tolerance = 300
+
     def __init__(self):
         super().__init__('stripe')
+        # HMAC pré-initialisé avec le secret, copié à chaque vérification
+        self._hmac_template = hmac.new(
+            (self.backend.webhook_secret or '').encode('utf-8'),
+            digestmod=hashlib.sha256
+        )
+
+    def _parse_signature_header(self, signature):
+        """Extraire l'horodatage et les signatures v1 de l'en-tête Stripe-Signature"""
+        timestamp = None
+        signatures = []
+
+        for item in (signature or '').split(','):
+            key, _, value = item.strip().partition('=')
+            if key == 't':
+                timestamp = value
+            elif key == 'v1':
+                signatures.append(value)
+
+        return timestamp, signatures
 
     def verify_signature(self, payload, signature, headers=None):
-        """Vérifier la signature Stripe"""
+        """Vérifier la signature Stripe (équivalent de Webhook.construct_event)"""
         try:
-            event = self.backend.verify_webhook(payload, signature)
-            return event
+            timestamp, signatures = self._parse_signature_header(signature)
+            if not timestamp or not signatures:
+                raise ValueError("Malformed Stripe-Signature header")
+
+            if time.time() - int(timestamp) > self.signature_tolerance:
+                raise ValueError("Timestamp outside the tolerance zone")
+
+            mac = self._hmac_template.copy()
+            mac.update(timestamp.encode('ascii') + b'.')
+            mac.update(payload)
+            expected_signature = mac.hexdigest()
+
+            if not any(hmac.compare_digest(expected_signature, sig) for sig in signatures):
+                raise ValueError("No matching v1 signature")
+
+            # Renvoyer le JSON brut : sérialisable tel quel pour Celery
+            return loads_payload(payload)
         except Exception as e:
-            logger.error(f"Stripe webhook signature verification failed: {str(e)}")
+            logger.error("Stripe webhook signature verification failed: %s", e)
             raise WebhookVerificationError(
                 message="Signature verification failed",
                 signature=signature
             )
 
+    def get_event_key(self, event, payload):
+        """Stripe fournit un identifiant d'événement unique"""
+        return event.get('id') or super().get_event_key(event, payload)
+
     def handle_event(self, event):
         """Traiter un événement Stripe"""
         event_type = event['type']
         event_data = event['data']['object']
 
-        logger.info(f"Processing Stripe webhook: {event_type}")
+        logger.info("Processing Stripe webhook: %s", event_type)
 
         handlers = {
             'payment_intent.succeeded': self._handle_payment_intent_succeeded,
@@ -86,111 +205,118 @@ class StripeWebhookHandler(WebhookHandler):
         if handler:
             return handler(event_data)
 
-        logger.debug(f"Unhandled Stripe event type: {event_type}")
+        logger.debug("Unhandled Stripe event type: %s", event_type)
         return {'status': 'unhandled', 'event_type': event_type}
 
     def _handle_payment_intent_succeeded(self, payment_intent):
         """Traiter un paiement réussi"""
         try:
+            now = timezone.now()
             with transaction.atomic():
-                # Trouver la transaction
-                transaction_obj = Transaction.objects.filter(
+                # Trouver la transaction (seules les colonnes utiles)
+                transaction_row = PaymentTransaction.objects.filter(
                     transaction_id=payment_intent['id']
-                ).first()
+                ).values('id', 'user_id', 'amount', 'currency').first()
 
-                if not transaction_obj:
-                    logger.warning(f"Transaction not found for payment intent: {payment_intent['id']}")
+                if not transaction_row:
+                    logger.warning("Transaction not found for payment intent: %s", payment_intent['id'])
                     return {'status': 'transaction_not_found'}
 
-                # Mettre à jour la transaction
-                transaction_obj.status = 'COMPLETED'
-                transaction_obj.processed_at = timezone.now()
-                transaction_obj.gateway_response = json.dumps(payment_intent)
-                transaction_obj.save()
+                # Mettre à jour la transaction sans la recharger
+                PaymentTransaction.objects.filter(pk=transaction_row['id']).update(
+                    status='COMPLETED',
+                    processed_at=now,
+                    gateway_response=json.dumps(payment_intent),
+                    updated_at=now
+                )
 
                 # Créer une facture
-                invoice = Invoice.objects.create(
-                    user=transaction_obj.user,
-                    transaction=transaction_obj,
-                    amount=transaction_obj.amount,
-                    currency=transaction_obj.currency,
+                invoice = Invoice(
+                    user_id=transaction_row['user_id'],
+                    transaction_id=transaction_row['id'],
+                    amount=transaction_row['amount'],
+                    currency=transaction_row['currency'],
                     status='PAID',
                     invoice_number=Invoice.generate_invoice_number(),
-                    due_date=timezone.now().date(),
-                    paid_at=timezone.now()
+                    due_date=now.date(),
+                    paid_at=now
                 )
+                invoice.save(force_insert=True)
 
-                logger.info(f"Payment succeeded: Transaction {transaction_obj.id}, Invoice {invoice.invoice_number}")
+                logger.info("Payment succeeded: Transaction %s, Invoice %s", transaction_row['id'], invoice.invoice_number)
 
-                # Tâches asynchrones
-                notify_transaction_completed.delay(transaction_obj.id)
-                generate_invoice_pdf_task.delay(invoice.id)
+                # Tâches asynchrones (indépendantes, publiées ensemble)
+                group(
+                    notify_transaction_completed.si(transaction_row['id']),
+                    generate_invoice_pdf_task.si(invoice.id)
+                ).apply_async()
 
                 return {
                     'status': 'success',
-                    'transaction_id': transaction_obj.id,
+                    'transaction_id': transaction_row['id'],
                     'invoice_id': invoice.id
                 }
 
         except Exception as e:
-            logger.error(f"Error handling payment intent succeeded: {str(e)}")
+            logger.error("Error handling payment intent succeeded: %s", e)
             raise
 
     def _handle_payment_intent_failed(self, payment_intent):
         """Traiter un paiement échoué"""
         try:
-            transaction_obj = Transaction.objects.filter(
+            transaction_obj = PaymentTransaction.objects.only('id', 'status').filter(
                 transaction_id=payment_intent['id']
             ).first()
 
             if transaction_obj:
                 transaction_obj.status = 'FAILED'
                 transaction_obj.gateway_response = json.dumps(payment_intent)
-                transaction_obj.save()
+                transaction_obj.save(update_fields=['status', 'gateway_response', 'updated_at'])
 
-                logger.info(f"Payment failed: Transaction {transaction_obj.id}")
+                logger.info("Payment failed: Transaction %s", transaction_obj.id)
 
             return {'status': 'handled'}
 
         except Exception as e:
-            logger.error(f"Error handling payment intent failed: {str(e)}")
+            logger.error("Error handling payment intent failed: %s", e)
             raise
 
     def _handle_payment_intent_canceled(self, payment_intent):
         """Traiter un paiement annulé"""
         try:
-            transaction_obj = Transaction.objects.filter(
+            transaction_obj = PaymentTransaction.objects.only('id', 'status').filter(
                 transaction_id=payment_intent['id']
             ).first()
 
             if transaction_obj:
                 transaction_obj.status = 'CANCELED'
                 transaction_obj.gateway_response = json.dumps(payment_intent)
-                transaction_obj.save()
+                transaction_obj.save(update_fields=['status', 'gateway_response', 'updated_at'])
 
-                logger.info(f"Payment canceled: Transaction {transaction_obj.id}")
+                logger.info("Payment canceled: Transaction %s", transaction_obj.id)
 
             return {'status': 'handled'}
 
         except Exception as e:
-            logger.error(f"Error handling payment intent canceled: {str(e)}")
+            logger.error("Error handling payment intent canceled: %s", e)
             raise
 
     def _handle_charge_refunded(self, charge):
         """Traiter un remboursement"""
         try:
+            now = timezone.now()
             with transaction.atomic():
                 # Trouver la transaction originale
-                transaction_obj = Transaction.objects.filter(
+                transaction_obj = PaymentTransaction.objects.only('id', 'currency').filter(
                     transaction_id=charge['payment_intent']
                 ).first()
 
                 if not transaction_obj:
-                    logger.warning(f"Original transaction not found for refund: {charge['id']}")
+                    logger.warning("Original transaction not found for refund: %s", charge['id'])
                     return {'status': 'transaction_not_found'}
 
                 # Créer un enregistrement de remboursement
-                refund_amount = charge['amount_refunded'] / 100
+                refund_amount = Decimal(charge['amount_refunded']) / 100
 
                 refund = Refund.objects.create(
                     transaction=transaction_obj,
@@ -199,84 +325,85 @@ class StripeWebhookHandler(WebhookHandler):
                     reason='PROCESSOR_REFUND',
                     status='COMPLETED',
                     gateway_refund_id=charge['id'],
-                    processed_at=timezone.now()
+                    processed_at=now
                 )
 
                 # Mettre à jour la transaction
                 transaction_obj.refunded_amount = refund_amount
-                transaction_obj.save()
+                transaction_obj.save(update_fields=['refunded_amount', 'updated_at'])
 
-                logger.info(f"Refund processed: Transaction {transaction_obj.id}, Refund {refund.id}")
+                logger.info("Refund processed: Transaction %s, Refund %s", transaction_obj.id, refund.id)
 
                 return {
                     'status': 'success',
                     'refund_id': refund.id,
-                    'amount': refund_amount
+                    'amount': str(refund_amount)
                 }
 
         except Exception as e:
-            logger.error(f"Error handling charge refunded: {str(e)}")
+            logger.error("Error handling charge refunded: %s", e)
             raise
 
     def _handle_charge_dispute_created(self, dispute):
         """Traiter une contestation (chargeback)"""
         try:
-            transaction_obj = Transaction.objects.filter(
+            transaction_obj = PaymentTransaction.objects.only('id').filter(
                 transaction_id=dispute['payment_intent']
             ).first()
 
             if transaction_obj:
                 transaction_obj.has_chargeback = True
                 transaction_obj.chargeback_reason = dispute.get('reason', 'unknown')
-                transaction_obj.save()
+                transaction_obj.save(update_fields=['has_chargeback', 'chargeback_reason', 'updated_at'])
 
-                logger.warning(f"Chargeback created: Transaction {transaction_obj.id}")
+                logger.warning("Chargeback created: Transaction %s", transaction_obj.id)
 
             return {'status': 'handled'}
 
         except Exception as e:
-            logger.error(f"Error handling charge dispute: {str(e)}")
+            logger.error("Error handling charge dispute: %s", e)
             raise
 
     def _handle_invoice_payment_succeeded(self, invoice):
         """Traiter une facture payée (abonnement)"""
         try:
+            now = timezone.now()
             subscription_id = invoice.get('subscription')
             if not subscription_id:
                 return {'status': 'no_subscription'}
 
             # Trouver l'abonnement
-            subscription = Subscription.objects.filter(
+            subscription = Subscription.objects.select_related('user').only('id', 'user').filter(
                 gateway_subscription_id=subscription_id
             ).first()
 
             if subscription:
                 # Créer une transaction pour le paiement de l'abonnement
-                transaction_obj = Transaction.objects.create(
+                transaction_obj = PaymentTransaction.objects.create(
                     user=subscription.user,
-                    amount=invoice['amount_paid'] / 100,
+                    amount=Decimal(invoice['amount_paid']) / 100,
                     currency=invoice['currency'].upper(),
                     payment_method='CREDIT_CARD',
                     purpose='SUBSCRIPTION_PAYMENT',
                     status='COMPLETED',
                     transaction_id=invoice.get('payment_intent'),
                     gateway_response=json.dumps(invoice),
-                    processed_at=timezone.now()
+                    processed_at=now
                 )
 
                 # Mettre à jour l'abonnement
-                subscription.last_payment_date = timezone.now().date()
+                subscription.last_payment_date = now.date()
                 subscription.next_billing_date = timezone.datetime.fromtimestamp(
                     invoice.get('lines', {}).get('data', [{}])[0].get('period', {}).get('end', 0)
                 ).date() if invoice.get('lines') else None
-                subscription.save()
+                subscription.save(update_fields=['last_payment_date', 'next_billing_date', 'updated_at'])
 
-                logger.info(f"Subscription payment succeeded: Subscription {subscription.id}, Transaction {transaction_obj.id}")
+                logger.info("Subscription payment succeeded: Subscription %s, Transaction %s", subscription.id, transaction_obj.id)
 
             return {'status': 'handled'}
 
         except Exception as e:
-            logger.error(f"Error handling invoice payment: {str(e)}")
+            logger.error("Error handling invoice payment: %s", e)
             raise
 
     def _handle_invoice_payment_failed(self, invoice):
@@ -286,76 +413,79 @@ class StripeWebhookHandler(WebhookHandler):
             if not subscription_id:
                 return {'status': 'no_subscription'}
 
-            subscription = Subscription.objects.filter(
+            subscription = Subscription.objects.only('id', 'status').filter(
                 gateway_subscription_id=subscription_id
             ).first()
 
             if subscription:
                 subscription.status = 'PAST_DUE'
-                subscription.save()
+                subscription.save(update_fields=['status', 'updated_at'])
 
-                logger.warning(f"Subscription payment failed: Subscription {subscription.id}")
+                logger.warning("Subscription payment failed: Subscription %s", subscription.id)
 
             return {'status': 'handled'}
 
         except Exception as e:
-            logger.error(f"Error handling invoice payment failed: {str(e)}")
+            logger.error("Error handling invoice payment failed: %s", e)
             raise
 
     def _handle_subscription_created(self, subscription_data):
         """Traiter la création d'un abonnement"""
         try:
             # Cette logique dépend de votre implémentation d'abonnement
-            logger.info(f"Subscription created: {subscription_data['id']}")
+            logger.info("Subscription created: %s", subscription_data['id'])
             return {'status': 'handled'}
 
         except Exception as e:
-            logger.error(f"Error handling subscription created: {str(e)}")
+            logger.error("Error handling subscription created: %s", e)
             raise
 
     def _handle_subscription_updated(self, subscription_data):
         """Traiter la mise à jour d'un abonnement"""
         try:
-            subscription = Subscription.objects.filter(
+            subscription = Subscription.objects.only('id', 'status').filter(
                 gateway_subscription_id=subscription_data['id']
             ).first()
 
             if subscription:
                 subscription.status = subscription_data['status'].upper()
-                subscription.save()
+                subscription.save(update_fields=['status', 'updated_at'])
 
-                logger.info(f"Subscription updated: {subscription.id}")
+                logger.info("Subscription updated: %s", subscription.id)
 
             return {'status': 'handled'}
 
         except Exception as e:
-            logger.error(f"Error handling subscription updated: {str(e)}")
+            logger.error("Error handling subscription updated: %s", e)
             raise
 
     def _handle_subscription_deleted(self, subscription_data):
         """Traiter la suppression d'un abonnement"""
         try:
-            subscription = Subscription.objects.filter(
+            now = timezone.now()
+            subscription = Subscription.objects.only('id', 'status').filter(
                 gateway_subscription_id=subscription_data['id']
             ).first()
 
             if subscription:
                 subscription.status = 'CANCELED'
-                subscription.canceled_at = timezone.now()
-                subscription.save()
+                subscription.canceled_at = now
+                subscription.save(update_fields=['status', 'canceled_at', 'updated_at'])
 
-                logger.info(f"Subscription canceled: {subscription.id}")
+                logger.info("Subscription canceled: %s", subscription.id)
 
             return {'status': 'handled'}
 
         except Exception as e:
-            logger.error(f"Error handling subscription deleted: {str(e)}")
+            logger.error("Error handling subscription deleted: %s", e)
             raise
 
 
 class PayPalWebhookHandler(WebhookHandler):
     """Gestionnaire de webhooks PayPal"""
 
+    task = process_paypal_event
+
     def __init__(self):
         super().__init__('paypal')
 
@@ -368,10 +498,11 @@ class PayPalWebhookHandler(WebhookHandler):
             raise WebhookVerificationError(message="Missing PayPal transmission ID")
 
         try:
-            event = self.backend.verify_webhook(payload, signature, transmission_id)
-            return event
+            self.backend.verify_webhook(payload, signature, transmission_id)
+            # Renvoyer le JSON brut : sérialisable tel quel pour Celery
+            return loads_payload(payload)
         except Exception as e:
-            logger.error(f"PayPal webhook verification failed: {str(e)}")
+            logger.error("PayPal webhook verification failed: %s", e)
             raise WebhookVerificationError(
                 message="Signature verification failed",
                 signature=signature
@@ -381,7 +512,7 @@ class PayPalWebhookHandler(WebhookHandler):
         """Traiter un événement PayPal"""
         event_type = event.get('event_type')
 
-        logger.info(f"Processing PayPal webhook: {event_type}")
+        logger.info("Processing PayPal webhook: %s", event_type)
 
         handlers = {
             'PAYMENT.CAPTURE.COMPLETED': self._handle_payment_capture_completed,
@@ -396,45 +527,48 @@ class PayPalWebhookHandler(WebhookHandler):
         if handler:
             return handler(event.get('resource', {}))
 
-        logger.debug(f"Unhandled PayPal event type: {event_type}")
+        logger.debug("Unhandled PayPal event type: %s", event_type)
         return {'status': 'unhandled', 'event_type': event_type}
 
     def _handle_payment_capture_completed(self, capture):
         """Traiter un paiement capturé"""
         try:
+            now = timezone.now()
             with transaction.atomic():
                 # Trouver la transaction
-                transaction_obj = Transaction.objects.filter(
+                transaction_obj = PaymentTransaction.objects.only('id', 'user', 'status').filter(
                     transaction_id=capture.get('id')
                 ).first()
 
                 if not transaction_obj:
-                    logger.warning(f"Transaction not found for PayPal capture: {capture.get('id')}")
+                    logger.warning("Transaction not found for PayPal capture: %s", capture.get('id'))
                     return {'status': 'transaction_not_found'}
 
                 # Mettre à jour la transaction
                 transaction_obj.status = 'COMPLETED'
-                transaction_obj.processed_at = timezone.now()
+                transaction_obj.processed_at = now
                 transaction_obj.gateway_response = json.dumps(capture)
-                transaction_obj.save()
+                transaction_obj.save(update_fields=['status', 'processed_at', 'gateway_response', 'updated_at'])
 
                 # Créer une facture
                 invoice = Invoice.objects.create(
                     user=transaction_obj.user,
                     transaction=transaction_obj,
-                    amount=float(capture.get('amount', {}).get('value', 0)),
+                    amount=Decimal(str(capture.get('amount', {}).get('value', 0))),
                     currency=capture.get('amount', {}).get('currency_code', 'EUR'),
                     status='PAID',
                     invoice_number=Invoice.generate_invoice_number(),
-                    due_date=timezone.now().date(),
-                    paid_at=timezone.now()
+                    due_date=now.date(),
+                    paid_at=now
                 )
 
-                logger.info(f"PayPal payment completed: Transaction {transaction_obj.id}")
+                logger.info("PayPal payment completed: Transaction %s", transaction_obj.id)
 
-                # Tâches asynchrones
-                notify_transaction_completed.delay(transaction_obj.id)
-                generate_invoice_pdf_task.delay(invoice.id)
+                # Tâches asynchrones (indépendantes, publiées ensemble)
+                group(
+                    notify_transaction_completed.si(transaction_obj.id),
+                    generate_invoice_pdf_task.si(invoice.id)
+                ).apply_async()
 
                 return {
                     'status': 'success',
@@ -443,45 +577,46 @@ class PayPalWebhookHandler(WebhookHandler):
                 }
 
         except Exception as e:
-            logger.error(f"Error handling PayPal payment completed: {str(e)}")
+            logger.error("Error handling PayPal payment completed: %s", e)
             raise
 
     def _handle_payment_capture_denied(self, capture):
         """Traiter un paiement refusé"""
         try:
-            transaction_obj = Transaction.objects.filter(
+            transaction_obj = PaymentTransaction.objects.only('id', 'status').filter(
                 transaction_id=capture.get('id')
             ).first()
 
             if transaction_obj:
                 transaction_obj.status = 'FAILED'
                 transaction_obj.gateway_response = json.dumps(capture)
-                transaction_obj.save()
+                transaction_obj.save(update_fields=['status', 'gateway_response', 'updated_at'])
 
-                logger.info(f"PayPal payment denied: Transaction {transaction_obj.id}")
+                logger.info("PayPal payment denied: Transaction %s", transaction_obj.id)
 
             return {'status': 'handled'}
 
         except Exception as e:
-            logger.error(f"Error handling PayPal payment denied: {str(e)}")
+            logger.error("Error handling PayPal payment denied: %s", e)
             raise
 
     def _handle_payment_capture_refunded(self, refund):
         """Traiter un remboursement PayPal"""
         try:
+            now = timezone.now()
             with transaction.atomic():
                 # Trouver la capture originale
                 capture_id = refund.get('capture_id')
-                transaction_obj = Transaction.objects.filter(
+                transaction_obj = PaymentTransaction.objects.only('id').filter(
                     transaction_id=capture_id
                 ).first()
 
                 if not transaction_obj:
-                    logger.warning(f"Original transaction not found for PayPal refund: {capture_id}")
+                    logger.warning("Original transaction not found for PayPal refund: %s", capture_id)
                     return {'status': 'transaction_not_found'}
 
                 # Créer un enregistrement de remboursement
-                refund_amount = float(refund.get('amount', {}).get('value', 0))
+                refund_amount = Decimal(str(refund.get('amount', {}).get('value', 0)))
 
                 refund_obj = Refund.objects.create(
                     transaction=transaction_obj,
@@ -490,84 +625,85 @@ class PayPalWebhookHandler(WebhookHandler):
                     reason='PROCESSOR_REFUND',
                     status='COMPLETED',
                     gateway_refund_id=refund.get('id'),
-                    processed_at=timezone.now()
+                    processed_at=now
                 )
 
                 # Mettre à jour la transaction
                 transaction_obj.refunded_amount = refund_amount
-                transaction_obj.save()
+                transaction_obj.save(update_fields=['refunded_amount', 'updated_at'])
 
-                logger.info(f"PayPal refund processed: Transaction {transaction_obj.id}")
+                logger.info("PayPal refund processed: Transaction %s", transaction_obj.id)
 
                 return {
                     'status': 'success',
                     'refund_id': refund_obj.id,
-                    'amount': refund_amount
+                    'amount': str(refund_amount)
                 }
 
         except Exception as e:
-            logger.error(f"Error handling PayPal refund: {str(e)}")
+            logger.error("Error handling PayPal refund: %s", e)
             raise
 
     def _handle_payment_capture_reversed(self, capture):
         """Traiter un paiement annulé"""
         try:
-            transaction_obj = Transaction.objects.filter(
+            transaction_obj = PaymentTransaction.objects.only('id', 'status').filter(
                 transaction_id=capture.get('id')
             ).first()
 
             if transaction_obj:
                 transaction_obj.status = 'REVERSED'
                 transaction_obj.gateway_response = json.dumps(capture)
-                transaction_obj.save()
+                transaction_obj.save(update_fields=['status', 'gateway_response', 'updated_at'])
 
-                logger.info(f"PayPal payment reversed: Transaction {transaction_obj.id}")
+                logger.info("PayPal payment reversed: Transaction %s", transaction_obj.id)
 
             return {'status': 'handled'}
 
         except Exception as e:
-            logger.error(f"Error handling PayPal payment reversed: {str(e)}")
+            logger.error("Error handling PayPal payment reversed: %s", e)
             raise
 
     def _handle_subscription_activated(self, subscription):
         """Traiter l'activation d'un abonnement"""
         try:
             subscription_id = subscription.get('id')
-            subscription_obj = Subscription.objects.filter(
+            subscription_obj = Subscription.objects.only('id', 'status').filter(
                 gateway_subscription_id=subscription_id
             ).first()
 
             if subscription_obj:
                 subscription_obj.status = 'ACTIVE'
-                subscription_obj.save()
+                subscription_obj.save(update_fields=['status', 'updated_at'])
 
-                logger.info(f"PayPal subscription activated: {subscription_obj.id}")
+                logger.info("PayPal subscription activated: %s", subscription_obj.id)
 
             return {'status': 'handled'}
 
         except Exception as e:
-            logger.error(f"Error handling PayPal subscription activated: {str(e)}")
+            logger.error("Error handling PayPal subscription activated: %s", e)
             raise
 
     def _handle_subscription_cancelled(self, subscription):
         """Traiter l'annulation d'un abonnement"""
         try:
+            now = timezone.now()
             subscription_id = subscription.get('id')
-            subscription_obj = Subscription.objects.filter(
+            subscription_obj = Subscription.objects.only('id', 'status').filter(
                 gateway_subscription_id=subscription_id
             ).first()
 
             if subscription_obj:
                 subscription_obj.status = 'CANCELED'
-                subscription_obj.canceled_at = timezone.now()
-                subscription_obj.save()
+                subscription_obj.canceled_at = now
+                subscription_obj.save(update_fields=['status', 'canceled_at', 'updated_at'])
 
-                logger.info(f"PayPal subscription canceled: {subscription_obj.id}")
+                logger.info("PayPal subscription canceled: %s", subscription_obj.id)
 
             return {'status': 'handled'}
 
         except Exception as e:
-            logger.error(f"Error handling PayPal subscription canceled: {str(e)}")
+            logger.error("Error handling PayPal subscription canceled: %s", e)
             raise
 
 
@@ -580,28 +716,33 @@ class CustomWebhookHandler(WebhookHandler):
 
         if not secret:
             logger.warning("Custom webhook secret not configured")
-            return payload
+            return loads_payload(payload)
 
-        # Calculer le HMAC
+        # Calculer le HMAC et comparer les octets bruts (32) plutôt que l'hexadécimal
         expected_signature = hmac.new(
             secret.encode('utf-8'),
-            payload.encode('utf-8'),
+            memoryview(payload),
             hashlib.sha256
-        ).hexdigest()
+        ).digest()
+
+        try:
+            provided_signature = bytes.fromhex(signature)
+        except ValueError:
+            provided_signature = b''
 
-        if not hmac.compare_digest(expected_signature, signature):
+        if not hmac.compare_digest(expected_signature, provided_signature):
             raise WebhookVerificationError(
                 message="HMAC signature verification failed",
                 signature=signature
             )
 
-        return json.loads(payload)
+        return loads_payload(payload)
 
     def handle_event(self, event):
         """Traiter un événement personnalisé"""
         event_type = event.get('type')
 
-        logger.info(f"Processing custom webhook: {event_type}")
+        logger.info("Processing custom webhook: %s", event_type)
 
         # Logique de traitement personnalisée
         # À adapter selon vos besoins
@@ -624,8 +765,8 @@ class WebhookView(View):
     def post(self, request, *args, **kwargs):
         """Traiter un webhook POST"""
         try:
-            # Récupérer les données
-            payload = request.body.decode('utf-8')
+            # Récupérer le corps brut : signé et décodé sans copie en str
+            payload = request.body
             signature = request.headers.get('Stripe-Signature') or \
                        request.headers.get('PAYPAL-AUTH-ALGO') or \
                        request.headers.get('X-Signature') or \
@@ -637,18 +778,25 @@ class WebhookView(View):
             # Vérifier la signature
             event = handler.verify_signature(payload, signature, request.headers)
 
-            # Traiter l'événement
-            result = handler.handle_event(event)
+            # Ignorer les réessais d'un événement déjà traité (l'enregistrement
+            # définitif est fait par la tâche, avec le traitement)
+            event_key = handler.get_event_key(event, payload)
+            if handler.is_processed(event_key):
+                logger.info("Duplicate webhook ignored: %s", handler.backend_name)
+                return JsonResponse({'status': 'success', 'result': {'status': 'duplicate'}})
 
-            logger.info(f"Webhook processed successfully: {result}")
+            # Traiter l'événement hors de la requête HTTP
+            result = handler.enqueue(event, event_key)
+
+            logger.info("Webhook accepted: %s", result)
 
             return JsonResponse({'status': 'success', 'result': result})
 
         except WebhookVerificationError as e:
-            logger.error(f"Webhook verification failed: {str(e)}")
+            logger.error("Webhook verification failed: %s", e)
             return JsonResponse({'error': 'Invalid signature'}, status=400)
         except Exception as e:
-            logger.error(f"Error processing webhook: {str(e)}")
+            logger.error("Error processing webhook: %s", e)
             return JsonResponse({'error': 'Internal server error'}, status=500)
 
 
@@ -656,45 +804,35 @@ class StripeWebhookView(WebhookView):
     """Vue pour les webhooks Stripe"""
 
     def get_handler(self):
-        return StripeWebhookHandler()
+        return get_webhook_handler(StripeWebhookHandler)
 
 
 class PayPalWebhookView(WebhookView):
     """Vue pour les webhooks PayPal"""
 
     def get_handler(self):
-        return PayPalWebhookHandler()
+        return get_webhook_handler(PayPalWebhookHandler)
 
 
 class CustomWebhookView(WebhookView):
     """Vue pour les webhooks personnalisés"""
 
     def get_handler(self):
-        return CustomWebhookHandler()
-
-
-@csrf_exempt
-@require_POST
-def stripe_webhook(request):
-    """Endpoint webhook Stripe"""
-    view = StripeWebhookView()
-    return view.post(request)
-
-
-@csrf_exempt
-@require_POST
-def paypal_webhook(request):
-    """Endpoint webhook PayPal"""
-    view = PayPalWebhookView()
-    return view.post(request)
-
-
-@csrf_exempt
-@require_POST
-def custom_webhook(request):
-    """Endpoint webhook personnalisé"""
-    view = CustomWebhookView()
-    return view.post(request)
+        return get_webhook_handler(CustomWebhookHandler)
+
+
+# Événement simulé par l'endpoint de test (jamais modifié par les gestionnaires)
+TEST_EVENT = {
+    'type': 'payment_intent.succeeded',
+    'data': {
+        'object': {
+            'id': 'test_pi_123',
+            'amount': 1000,
+            'currency': 'eur',
+            'status': 'succeeded',
+        }
+    }
+}
 
 
 def test_webhook(request):
@@ -702,21 +840,8 @@ def test_webhook(request):
     if not settings.DEBUG:
         return JsonResponse({'error': 'Not available in production'}, status=403)
 
-    # Simuler un événement de test
-    test_event = {
-        'type': 'payment_intent.succeeded',
-        'data': {
-            'object': {
-                'id': 'test_pi_123',
-                'amount': 1000,
-                'currency': 'eur',
-                'status': 'succeeded',
-            }
-        }
-    }
-
-    handler = StripeWebhookHandler()
-    result = handler.handle_event(test_event)
+    handler = get_webhook_handler(StripeWebhookHandler)
+    result = handler.handle_event(TEST_EVENT)
 
     return JsonResponse({
         'status': 'test_completed',
@@ -1,29 +1,62 @@
 #!/usr/bin/env python3
 import os
-import glob
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+def iter_backups(root=''):
+    """Parcourt récursivement root et génère les chemins des fichiers .backup"""
+    try:
+        entries = os.scandir(root or '.')
+    except OSError:
+        return
+
+    with entries:
+        for entry in entries:
+            # Comme glob : fichiers et dossiers cachés ignorés
+            if entry.name.startswith('.'):
+                continue
+
+            path = entry.path if root else entry.name
+            # DirEntry garde le type en cache : pas de stat supplémentaire
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_backups(path)
+            elif entry.name.endswith('.backup'):
+                yield path
+
+def _restore_one(backup_file):
+    """Restaure un fichier backup et retourne la ligne de compte rendu"""
+    original_file = backup_file.replace('.backup', '')
+
+    # Seuls les fichiers encore présents sont restaurés (un backup orphelin
+    # ne ressuscite pas un fichier supprimé)
+    if not (os.path.exists(backup_file) and os.path.exists(original_file)):
+        return None
+
+    try:
+        # Renommage atomique : le backup devient l'original, sans copie,
+        # avec les permissions de l'original
+        shutil.copymode(original_file, backup_file)
+        os.replace(backup_file, original_file)
+        return f"✓ Restauré : {original_file}"
+    except Exception as e:
+        return f"✗ Erreur : {original_file} - {e}"
 
 def restore_backups():
-    backup_files = glob.glob("**/*.backup", recursive=True)
+    # Les renommages sont bloquants : on les recouvre dans un pool de threads,
+    # alimenté au fil du parcours sans attendre la fin de l'énumération
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        lines = list(executor.map(_restore_one, iter_backups()))
 
-    if not backup_files:
+    if not lines:
         print("Aucun fichier backup trouvé.")
         return
 
-    print(f"Trouvé {len(backup_files)} fichier(s) backup :")
-
-    for backup_file in backup_files:
-        original_file = backup_file.replace('.backup', '')
-
-        if os.path.exists(backup_file) and os.path.exists(original_file):
-            try:
-                with open(backup_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                with open(original_file, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                os.remove(backup_file)
-                print(f"✓ Restauré : {original_file}")
-            except Exception as e:
-                print(f"✗ Erreur : {original_file} - {e}")
+    print(f"Trouvé {len(lines)} fichier(s) backup :")
+
+    # Affichage après coup pour ne pas entremêler les sorties des threads
+    for line in lines:
+        if line:
+            print(line)
 
     print("\nRestauration terminée.")
 
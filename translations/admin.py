@@ -1,9 +1,13 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
-from django.urls import reverse
-from django.db.models import Count, Avg, Q
+from django.urls import reverse, NoReverseMatch
+from django.core.cache import cache
+from django.db.models import Count, Avg, Q, F, Func, ExpressionWrapper, FloatField, IntegerField
+from django.db.models.functions import Cast, NullIf, Substr
 from datetime import datetime, timedelta
+from functools import lru_cache
+import threading
 from django.utils import timezone
 
 from .models import (
@@ -11,13 +15,71 @@ from .models import (
     TranslationSettings, APILog
 )
 
-# Essayer d'importer humanize, mais continuer sans si non disponible
-try:
-    import humanize
-    HUMANIZE_AVAILABLE = True
-except ImportError:
-    HUMANIZE_AVAILABLE = False
-    print("Module 'humanize' non installé. L'installation est recommandée: pip install humanize")
+@lru_cache(maxsize=128)
+def _admin_change_url_pattern(app_label, model_name):
+    """
+    Gabarit de l'URL de modification admin pour un modèle ('__pk__' à la place du pk)
+
+    reverse() ne parcourt le résolveur qu'une fois par modèle ; None si le
+    modèle n'est pas enregistré dans l'admin.
+    """
+    try:
+        url = reverse(f'admin:{app_label}_{model_name}_change', args=['__pk__'])
+    except NoReverseMatch:
+        return None
+    return url
+
+
+class JSONArrayLength(Func):
+    """Longueur d'un tableau JSON, calculée par la base de données"""
+    function = 'JSON_LENGTH'
+    output_field = IntegerField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function='JSONB_ARRAY_LENGTH', **extra_context)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function='JSON_ARRAY_LENGTH', **extra_context)
+
+
+def _is_changelist_request(request):
+    """Vrai pour la liste des objets (pas pour le formulaire de modification)"""
+    match = getattr(request, 'resolver_match', None)
+    return bool(match and match.url_name and match.url_name.endswith('_changelist'))
+
+
+def _badge(color, label):
+    return format_html('<span style="color: {}; font-weight: bold;">{}</span>', color, label)
+
+
+# Badges HTML précalculés : ils ne dépendent que de la valeur du champ
+_STATUS_COLORS = {
+    'pending': 'gray',
+    'processing': 'orange',
+    'completed': 'green',
+    'failed': 'red',
+    'partial': 'yellow',
+}
+_STATUS_HTML = {
+    value: _badge(_STATUS_COLORS.get(value, 'gray'), label)
+    for value, label in TranslationJob.STATUS_CHOICES
+}
+
+_QUALITY_COLORS = {
+    'auto': 'gray',
+    'human': 'green',
+    'edited': 'blue',
+    'reviewed': 'purple',
+}
+_QUALITY_HTML = {
+    value: _badge(_QUALITY_COLORS.get(value, 'gray'), label)
+    for value, label in Translation.QUALITY_CHOICES
+}
+
+_SUCCESS_HTML = format_html('<span style="color: green; font-weight: bold;">✓ SUCCÈS</span>')
+_FAILURE_HTML = format_html('<span style="color: red; font-weight: bold;">✗ ÉCHEC</span>')
+_CURRENT_HTML = format_html('<span style="color: green; font-weight: bold;">✓</span>')
+_NOT_CURRENT_HTML = format_html('<span style="color: gray;">✗</span>')
 
 
 @admin.register(TranslationMemory)
@@ -31,10 +93,20 @@ class TranslationMemoryAdmin(admin.ModelAdmin):
     search_fields = ('translated_text', 'source_text_hash')
     readonly_fields = ('source_text_hash', 'usage_count', 'created_at', 'updated_at')
 
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if _is_changelist_request(request):
+            # Liste : seul le début du texte traduit est transféré pour l'aperçu
+            return queryset.annotate(
+                _preview=Substr('translated_text', 1, 51)
+            ).defer('translated_text')
+        return queryset
+
     def translated_text_preview(self, obj):
-        if len(obj.translated_text) > 50:
-            return f"{obj.translated_text[:50]}..."
-        return obj.translated_text
+        text = obj._preview if hasattr(obj, '_preview') else obj.translated_text
+        if len(text) > 50:
+            return f"{text[:50]}..."
+        return text
     translated_text_preview.short_description = _('Texte traduit')
 
     def confidence_score_display(self, obj):
@@ -63,35 +135,51 @@ class TranslationJobAdmin(admin.ModelAdmin):
     )
     actions = ['retry_failed_jobs', 'cancel_jobs']
 
+    # État propre à la requête en cours (l'instance admin est partagée)
+    _request_state = threading.local()
+
+    def get_queryset(self, request):
+        # Type de contenu joint et objets liés préchargés (une requête par type),
+        # progression calculée en SQL (triable dans la liste)
+        queryset = super().get_queryset(request).select_related(
+            'content_type'
+        ).prefetch_related('content_object').annotate(
+            _progress=ExpressionWrapper(
+                100.0 * JSONArrayLength(F('completed_languages'))
+                / NullIf(JSONArrayLength(F('target_languages')), 0),
+                output_field=FloatField()
+            )
+        )
+        if _is_changelist_request(request):
+            # Liste : uniquement les colonnes affichées (pas de texte original)
+            queryset = queryset.only(
+                'id', 'content_type', 'object_id', 'field_name', 'source_language',
+                'status', 'total_characters', 'created_at'
+            )
+        return queryset
+
     def content_object_link(self, obj):
         if obj.content_object:
-            app_label = obj.content_type.app_label
-            model_name = obj.content_type.model
-            try:
-                url = reverse(f'admin:{app_label}_{model_name}_change', args=[obj.object_id])
-                return format_html('<a href="{}">{}</a>', url, str(obj.content_object)[:50])
-            except:
+            pattern = _admin_change_url_pattern(obj.content_type.app_label, obj.content_type.model)
+            if pattern is None:
                 return str(obj.content_object)[:50]
+            url = pattern.replace('__pk__', str(obj.object_id))
+            return format_html('<a href="{}">{}</a>', url, str(obj.content_object)[:50])
         return f"{obj.content_type} - {obj.object_id}"
     content_object_link.short_description = _('Contenu')
 
     def status_display(self, obj):
-        colors = {
-            'pending': 'gray',
-            'processing': 'orange',
-            'completed': 'green',
-            'failed': 'red',
-            'partial': 'yellow',
-        }
-        color = colors.get(obj.status, 'gray')
-        return format_html(
-            '<span style="color: {}; font-weight: bold;">{}</span>',
-            color, obj.get_status_display()
-        )
+        badge = _STATUS_HTML.get(obj.status)
+        if badge is None:
+            return _badge('gray', obj.get_status_display())
+        return badge
     status_display.short_description = _('Statut')
 
     def progress_bar(self, obj):
-        percentage = obj.progress_percentage
+        if hasattr(obj, '_progress'):
+            percentage = int(obj._progress or 0)
+        else:
+            percentage = obj.progress_percentage
         color = 'green' if percentage == 100 else 'orange' if percentage > 0 else 'gray'
         return format_html(
             '<div style="width: 100px; background: #eee; border-radius: 3px;">'
@@ -100,16 +188,25 @@ class TranslationJobAdmin(admin.ModelAdmin):
             percentage, color, percentage
         )
     progress_bar.short_description = _('Progression')
+    progress_bar.admin_order_field = '_progress'
+
+    def changelist_view(self, request, extra_context=None):
+        # Horodatage calculé une fois par affichage de la liste (par thread)
+        self._request_state.now_ts = timezone.now().timestamp()
+        try:
+            return super().changelist_view(request, extra_context)
+        finally:
+            self._request_state.now_ts = None
 
     def created_at_display(self, obj):
-        now = timezone.now()
-        delta = now - obj.created_at
-        if delta < timedelta(minutes=1):
+        now_ts = getattr(self._request_state, 'now_ts', None) or timezone.now().timestamp()
+        seconds = int(now_ts - obj.created_at.timestamp())
+        if seconds < 60:
             return _("À l'instant")
-        elif delta < timedelta(hours=1):
-            return _("Il y a {} minutes").format(delta.seconds // 60)
-        elif delta < timedelta(days=1):
-            return _("Il y a {} heures").format(delta.seconds // 3600)
+        elif seconds < 3600:
+            return _("Il y a {} minutes").format(seconds // 60)
+        elif seconds < 86400:
+            return _("Il y a {} heures").format(seconds // 3600)
         return obj.created_at.strftime('%Y-%m-%d %H:%M')
     created_at_display.short_description = _('Créé')
 
@@ -126,13 +223,10 @@ class TranslationJobAdmin(admin.ModelAdmin):
     failed_languages_display.short_description = _('Langues échouées')
 
     def retry_failed_jobs(self, request, queryset):
-        count = 0
-        for job in queryset.filter(status__in=['failed', 'partial']):
-            job.status = 'pending'
-            job.retry_count = 0
-            job.error_message = ''
-            job.save()
-            count += 1
+        # Un seul UPDATE : aucun signal ne relance de travail sur save()
+        count = queryset.filter(status__in=['failed', 'partial']).update(
+            status='pending', retry_count=0, error_message=''
+        )
         self.message_user(request, f"{count} travaux relancés.")
     retry_failed_jobs.short_description = _('Relancer les travaux échoués')
 
@@ -157,44 +251,48 @@ class TranslationAdmin(admin.ModelAdmin):
         'source_language', 'version', 'created_at', 'updated_at'
     )
 
+    def get_queryset(self, request):
+        # Type de contenu joint et objets liés préchargés (une requête par type),
+        # seul le début du texte traduit est transféré pour l'aperçu
+        queryset = super().get_queryset(request).select_related(
+            'content_type'
+        ).prefetch_related('content_object').annotate(
+            _preview=Substr('translated_text', 1, 61)
+        )
+        if _is_changelist_request(request):
+            # Liste : uniquement les colonnes affichées (textes complets exclus)
+            return queryset.only(
+                'id', 'content_type', 'object_id', 'field_name', 'language',
+                'quality', 'confidence_score', 'is_current', 'created_at'
+            )
+        return queryset
+
     def content_object_link(self, obj):
         if obj.content_object:
-            app_label = obj.content_type.app_label
-            model_name = obj.content_type.model
-            try:
-                url = reverse(f'admin:{app_label}_{model_name}_change', args=[obj.object_id])
-                return format_html('<a href="{}">{}</a>', url, str(obj.content_object)[:50])
-            except:
+            pattern = _admin_change_url_pattern(obj.content_type.app_label, obj.content_type.model)
+            if pattern is None:
                 return str(obj.content_object)[:50]
+            url = pattern.replace('__pk__', str(obj.object_id))
+            return format_html('<a href="{}">{}</a>', url, str(obj.content_object)[:50])
         return f"{obj.content_type} - {obj.object_id}"
     content_object_link.short_description = _('Contenu')
 
     def language_display(self, obj):
-        from django.utils.translation import get_language_info
-        try:
-            return get_language_info(obj.language)['name_translated']
-        except:
-            return obj.language
+        return obj.language_name
     language_display.short_description = _('Langue')
 
     def quality_display(self, obj):
-        colors = {
-            'auto': 'gray',
-            'human': 'green',
-            'edited': 'blue',
-            'reviewed': 'purple',
-        }
-        color = colors.get(obj.quality, 'gray')
-        return format_html(
-            '<span style="color: {}; font-weight: bold;">{}</span>',
-            color, obj.get_quality_display()
-        )
+        badge = _QUALITY_HTML.get(obj.quality)
+        if badge is None:
+            return _badge('gray', obj.get_quality_display())
+        return badge
     quality_display.short_description = _('Qualité')
 
     def translated_text_preview(self, obj):
-        if len(obj.translated_text) > 60:
-            return f"{obj.translated_text[:60]}..."
-        return obj.translated_text
+        text = obj._preview if hasattr(obj, '_preview') else obj.translated_text
+        if len(text) > 60:
+            return f"{text[:60]}..."
+        return text
     translated_text_preview.short_description = _('Texte traduit')
 
     def confidence_score_display(self, obj):
@@ -205,8 +303,8 @@ class TranslationAdmin(admin.ModelAdmin):
 
     def is_current_display(self, obj):
         if obj.is_current:
-            return format_html('<span style="color: green; font-weight: bold;">✓</span>')
-        return format_html('<span style="color: gray;">✗</span>')
+            return _CURRENT_HTML
+        return _NOT_CURRENT_HTML
     is_current_display.short_description = _('Courant')
 
 
@@ -236,8 +334,8 @@ class APILogAdmin(admin.ModelAdmin):
 
     def success_display(self, obj):
         if obj.success:
-            return format_html('<span style="color: green; font-weight: bold;">✓ SUCCÈS</span>')
-        return format_html('<span style="color: red; font-weight: bold;">✗ ÉCHEC</span>')
+            return _SUCCESS_HTML
+        return _FAILURE_HTML
     success_display.short_description = _('Statut')
 
     def response_time_display(self, obj):
@@ -265,22 +363,32 @@ class TranslationDashboard(admin.AdminSite):
     site_title = "Dashboard Traductions"
     index_title = "Statistiques des traductions"
 
-    def index(self, request, extra_context=None):
+    # Agrégats du tableau de bord : un léger décalage est acceptable
+    stats_cache_key = 'translation:dashboard:stats'
+    stats_cache_timeout = 60
+
+    def get_dashboard_stats(self):
+        """Calcule les statistiques du tableau de bord (listes évaluées, cachables)"""
         from django.db.models import Count, Avg
         from datetime import timedelta
 
-        # Statistiques de base
+        # Statistiques de base (compteurs des travaux en une seule requête)
+        job_stats = TranslationJob.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='processing')),
+            failed=Count('id', filter=Q(status='failed')),
+        )
         stats = {
             'total_translations': Translation.objects.count(),
-            'total_jobs': TranslationJob.objects.count(),
-            'active_jobs': TranslationJob.objects.filter(status='processing').count(),
-            'failed_jobs': TranslationJob.objects.filter(status='failed').count(),
+            'total_jobs': job_stats['total'],
+            'active_jobs': job_stats['active'],
+            'failed_jobs': job_stats['failed'],
         }
 
         # Distribution par langue
-        lang_dist = Translation.objects.values('language').annotate(
+        lang_dist = list(Translation.objects.values('language').annotate(
             count=Count('id')
-        ).order_by('-count')
+        ).order_by('-count'))
 
         # Performance API (dernières 24h)
         last_24h = timezone.now() - timedelta(hours=24)
@@ -288,17 +396,22 @@ class TranslationDashboard(admin.AdminSite):
             created_at__gte=last_24h
         ).aggregate(
             avg_response=Avg('response_time'),
-            success_rate=Avg('success') * 100
+            success_rate=Avg(Cast('success', IntegerField())) * 100
         )
 
-        extra_context = {
+        return {
             'stats': stats,
             'lang_dist': lang_dist,
             'api_stats': api_stats,
-            'recent_jobs': TranslationJob.objects.order_by('-created_at')[:10],
-            'recent_errors': APILog.objects.filter(success=False).order_by('-created_at')[:10],
+            'recent_jobs': list(TranslationJob.objects.order_by('-created_at')[:10]),
+            'recent_errors': list(APILog.objects.filter(success=False).order_by('-created_at')[:10]),
         }
 
+    def index(self, request, extra_context=None):
+        extra_context = cache.get_or_set(
+            self.stats_cache_key, self.get_dashboard_stats, self.stats_cache_timeout
+        )
+
         return super().index(request, extra_context)
 
 
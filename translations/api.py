@@ -1,36 +1,193 @@
+import atexit
 import hashlib
+import json
 import logging
+import os
+import queue
+import re
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, List, Optional
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
 from django.core.cache import cache
-from tenacity import (
-    retry, stop_after_attempt, wait_exponential,
-    retry_if_exception_type, before_sleep_log
-)
+from django.db import connection, connections
+from django.db.models import F
 from .models import TranslationMemory, APILog
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from celery.signals import worker_process_shutdown
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Script Lua du seau à jetons, exécuté atomiquement par Redis
+with open(os.path.join(os.path.dirname(__file__), 'ratelimit.lua')) as _script_file:
+    RATE_LIMIT_SCRIPT = _script_file.read()
+
+# Ligne de réponse d'un appel batch : "3. texte traduit"
+BATCH_LINE_RE = re.compile(r'^\s*(\d+)\.\s+(.*)$', re.MULTILINE)
+
+# Balise HTML complète, pour vérifier qu'elles survivent à la traduction
+TAG_RE = re.compile(r'<[^>]+>')
+
+# Découpage des textes longs : paragraphes, puis phrases (séparateurs conservés)
+PARAGRAPH_SPLIT_RE = re.compile(r'(\n\s*\n)')
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])(\s+)')
+
+# Lignes parasites ajoutées par le modèle autour de la traduction
+CLEAN_MARKER_RE = re.compile(r'traduction|translation|```', re.IGNORECASE)
+
+
+# Message système identique pour tous les appels
+SYSTEM_MESSAGE = {'role': 'system', 'content': 'Traducteur professionnel.'}
+
 
 class DeepSeekAPIError(Exception):
     pass
 
 
+def _has_letters(text: str) -> bool:
+    # Nombres, emojis, ponctuation : rien à traduire ni à mettre en cache
+    return any(char.isalpha() for char in text)
+
+
+# Marque les threads du pool de translate_batch (pas de pool imbriqué)
+_worker_state = threading.local()
+
+
+class _LogBuffer:
+    """
+    File d'attente des journaux d'appels API.
+
+    Un thread démon les insère par lots (bulk_create) : l'appel de traduction
+    n'attend plus l'INSERT de son APILog.
+    """
+    BATCH_SIZE = 100
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, entry: Dict):
+        self._queue.put(entry)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name='apilog-flush', daemon=True
+                    )
+                    self._thread.start()
+
+    def _drain(self, block: bool) -> List[Dict]:
+        batch = []
+        try:
+            if block:
+                batch.append(self._queue.get(timeout=self.FLUSH_INTERVAL))
+            while len(batch) < self.BATCH_SIZE:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write(self, batch: List[Dict]):
+        try:
+            APILog.objects.bulk_create(
+                [APILog(**entry) for entry in batch], ignore_conflicts=True
+            )
+        except Exception as e:
+            logger.error(f"Log API error: {e}")
+
+    def _run(self):
+        while True:
+            batch = self._drain(block=True)
+            if batch:
+                self._write(batch)
+                connections.close_all()
+
+    def flush(self):
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                return
+            self._write(batch)
+
+    def reset_after_fork(self):
+        # Le thread du parent n'existe pas dans l'enfant et les entrées
+        # copiées restent à la charge du parent : on repart de zéro
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+
+_log_buffer = _LogBuffer()
+atexit.register(_log_buffer.flush)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_log_buffer.reset_after_fork)
+
+if CELERY_AVAILABLE:
+    # Les processus enfants du pool prefork sortent par os._exit() :
+    # atexit n'y est jamais appelé
+    @worker_process_shutdown.connect(weak=False)
+    def flush_api_logs_on_worker_shutdown(**kwargs):
+        _log_buffer.flush()
+
+
+def save_translation_memory(text_hash: str, source_lang: str, target_lang: str,
+                            translated_text: str, confidence_score: Optional[float] = None):
+    # Upsert en une requête (ON CONFLICT / ON DUPLICATE KEY) sur la clé unique ;
+    # MySQL ne prend pas de colonnes cibles pour le conflit
+    unique_fields = (
+        ['source_text_hash', 'source_language', 'target_language']
+        if connection.features.supports_update_conflicts_with_target else None
+    )
+    TranslationMemory.objects.bulk_create(
+        [TranslationMemory(
+            source_text_hash=text_hash,
+            source_language=source_lang,
+            target_language=target_lang,
+            translated_text=translated_text,
+            confidence_score=confidence_score,
+            usage_count=1,
+        )],
+        update_conflicts=True,
+        update_fields=['translated_text', 'confidence_score', 'usage_count', 'updated_at'],
+        unique_fields=unique_fields,
+    )
+
+
 class DeepSeekAPIClient:
-    DEFAULT_CONFIG = {
+    DEFAULT_CONFIG = MappingProxyType({
         'API_URL': 'https://api.deepseek.com/v1/chat/completions',
         'MODEL': 'deepseek-chat',
         'TIMEOUT': 30,
         'MAX_RETRIES': 3,
         'BATCH_SIZE': 5,
+        'MAX_WORKERS': 8,
         'RATE_LIMIT_PER_MINUTE': 60,
         'TEMPERATURE': 0.1,
         'MAX_TOKENS': 4000,
-    }
+        'ASYNC_MEMORY_WRITES': False,
+        'MAX_CHARS_PER_CALL': 6000,
+    })
 
-    LANGUAGE_MAP = {
+    LANGUAGE_MAP = MappingProxyType({
         'fr': 'French',
         'en': 'English',
         'ar': 'Arabic',
@@ -42,114 +199,232 @@ class DeepSeekAPIClient:
         'zh': 'Chinese',
         'tr': 'Turkish',
         'nl': 'Dutch',
-    }
+    })
+
+    # Dérivé une fois au chargement de la classe
+    SUPPORTED_LANGUAGES = tuple(LANGUAGE_MAP)
+
+    # Cache de premier niveau en mémoire du processus, devant Redis et la base
+    L1_MAX_SIZE = 2048
+
+    # Durée de vie des traductions dans Redis, reprise pour le cache local :
+    # une entrée corrigée en base finit par être relue dans chaque processus
+    CACHE_TIMEOUT = 3600
+
+    HTTP_POOL_SIZE = 32
+
+    PROMPT_TEMPLATE = (
+        "Traduis de {src} à {tgt}.\n"
+        "Conserve format, HTML, liens, nombres.\n"
+        "Pas de modification noms propres, codes, emails, URLs.\n"
+        "\n"
+        "Texte:\n"
+        "{text}\n"
+        "\n"
+        "Traduction en {tgt}:"
+    )
+
+    BATCH_PROMPT_TEMPLATE = (
+        "Traduis chaque ligne numérotée de {src} à {tgt}.\n"
+        "Conserve format, HTML, liens, nombres.\n"
+        "Pas de modification noms propres, codes, emails, URLs.\n"
+        "Réponds uniquement par les traductions, une par ligne, avec la même numérotation.\n"
+        "\n"
+        "{numbered}"
+    )
 
     def __init__(self, api_key: Optional[str] = None):
-        self.config = self.DEFAULT_CONFIG.copy()
-        if hasattr(settings, 'DEEPSEEK_CONFIG'):
-            self.config.update(settings.DEEPSEEK_CONFIG)
+        self.config = {**self.DEFAULT_CONFIG, **getattr(settings, 'DEEPSEEK_CONFIG', {})}
 
         self.api_key = api_key or getattr(settings, 'DEEPSEEK_API_KEY', None)
         if not self.api_key:
             logger.warning("Aucune clé API DeepSeek configurée")
 
+        # Appels parallèles bornés par le débit autorisé : le seau à jetons cadence
+        self.max_workers = max(1, min(self.config['MAX_WORKERS'], self.config['RATE_LIMIT_PER_MINUTE']))
+
         self.session = requests.Session()
+        # Connexions TLS conservées et partagées entre threads ; les reprises
+        # restent gérées par _post_with_retry (POST non idempotent côté urllib3)
+        pool_size = max(self.HTTP_POOL_SIZE, self.max_workers)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=0),
+        )
+        self.session.mount('https://', adapter)
         self.session.headers.update({
+            'Connection': 'keep-alive',
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json',
         })
         self.rate_limit_cache_key = 'deepseek_rate_limit'
+        self._rate_limit_script = None
+        self._l1 = OrderedDict()
+        self._l1_lock = threading.Lock()
 
-    def _check_rate_limit(self) -> bool:
-        cache_key = self.rate_limit_cache_key
-        current_time = time.time()
-        minute_ago = current_time - 60
-        request_history = cache.get(cache_key, [])
-        recent_requests = [t for t in request_history if t > minute_ago]
-
-        if len(recent_requests) >= self.config['RATE_LIMIT_PER_MINUTE']:
-            logger.warning("Rate limit atteint")
-            return False
+    def _get_redis_client(self):
+        # django-redis puis backend Redis natif de Django ; None pour les autres caches
+        try:
+            if hasattr(cache, 'client') and hasattr(cache.client, 'get_client'):
+                return cache.client.get_client(write=True)
+            if hasattr(cache, '_cache') and hasattr(cache._cache, 'get_client'):
+                return cache._cache.get_client(write=True)
+        except Exception as e:
+            logger.warning(f"Client Redis indisponible pour le rate limit: {e}")
+        return None
+
+    def _take_rate_limit_token(self):
+        """
+        Prend un jeton dans le seau (capacité et débit tirés de RATE_LIMIT_PER_MINUTE).
+
+        Retourne (autorisé, secondes à attendre avant le prochain jeton).
+        """
+        now = time.time()
+        capacity = self.config['RATE_LIMIT_PER_MINUTE']
+        rate = capacity / 60.0
+
+        client = self._get_redis_client()
+        if client is not None:
+            if self._rate_limit_script is None:
+                self._rate_limit_script = client.register_script(RATE_LIMIT_SCRIPT)
+            allowed, wait = self._rate_limit_script(
+                keys=[cache.make_key(self.rate_limit_cache_key)],
+                args=[now, rate, capacity],
+                client=client,
+            )
+            return bool(int(allowed)), float(wait)
 
-        recent_requests.append(current_time)
-        cache.set(cache_key, recent_requests, timeout=60)
-        return True
+        # Sans Redis : même seau en deux scalaires dans le cache (non atomique)
+        tokens, last_refill = cache.get(self.rate_limit_cache_key) or (capacity, now)
+        tokens = min(capacity, tokens + max(0.0, now - last_refill) * rate)
+        if tokens >= 1:
+            cache.set(self.rate_limit_cache_key, (tokens - 1, now), timeout=61)
+            return True, 0.0
+        cache.set(self.rate_limit_cache_key, (tokens, now), timeout=61)
+        return False, (1 - tokens) / rate
 
     def _wait_for_rate_limit(self):
-        while not self._check_rate_limit():
-            time.sleep(1)
+        while True:
+            allowed, wait = self._take_rate_limit_token()
+            if allowed:
+                return
+            time.sleep(wait)
 
-    def _get_language_name(self, language_code: str) -> str:
-        return self.LANGUAGE_MAP.get(language_code, language_code.capitalize())
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _get_language_name(language_code: str) -> str:
+        return DeepSeekAPIClient.LANGUAGE_MAP.get(language_code, language_code.capitalize())
 
     def _generate_text_hash(self, text: str, source_lang: str, target_lang: str) -> str:
         content = f"{text}|{source_lang}|{target_lang}"
         return hashlib.md5(content.encode('utf-8')).hexdigest()
 
-    def _check_memory_cache(self, text: str, source_lang: str, target_lang: str) -> Optional[Dict]:
-        cache_key = f"translation:{source_lang}:{target_lang}:{hashlib.md5(text.encode()).hexdigest()}"
+    def _l1_get(self, key):
+        with self._l1_lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.monotonic():
+                del self._l1[key]
+                return None
+            self._l1.move_to_end(key)
+            return entry
+
+    def _l1_set(self, key, translated_text: str, confidence_score: float):
+        with self._l1_lock:
+            self._l1[key] = (translated_text, confidence_score, time.monotonic() + self.CACHE_TIMEOUT)
+            self._l1.move_to_end(key)
+            if len(self._l1) > self.L1_MAX_SIZE:
+                self._l1.popitem(last=False)
+
+    def _check_memory_cache(self, text: str, source_lang: str, target_lang: str,
+                            text_hash: Optional[str] = None) -> Optional[Dict]:
+        if not _has_letters(text):
+            return None
+
+        # Niveau 1 : dictionnaire LRU local, clé en tuple (pas de hachage MD5)
+        l1_key = (source_lang, target_lang, text)
+        entry = self._l1_get(l1_key)
+        if entry is not None:
+            return {
+                'translated_text': entry[0],
+                'from_cache': 'memory',
+                'confidence_score': entry[1]
+            }
+
+        # Une seule empreinte pour Redis et la mémoire de traduction (clés du
+        # préchauffage update_translation_cache comprises)
+        text_hash = text_hash or self._generate_text_hash(text, source_lang, target_lang)
+        cache_key = f"translation:{source_lang}:{target_lang}:{text_hash}"
         cached = cache.get(cache_key)
         if cached:
             logger.debug(f"Cache Redis hit: {cache_key}")
+            self._l1_set(l1_key, cached, 1.0)
             return {
                 'translated_text': cached,
                 'from_cache': 'redis',
                 'confidence_score': 1.0
             }
 
-        text_hash = self._generate_text_hash(text, source_lang, target_lang)
-        try:
-            memory = TranslationMemory.objects.get(
-                source_text_hash=text_hash,
-                source_language=source_lang,
-                target_language=target_lang
-            )
-            memory.usage_count += 1
-            memory.save(update_fields=['usage_count'])
-            cache.set(cache_key, memory.translated_text, timeout=3600)
-            logger.debug(f"Cache DB hit: {text_hash}")
-            return {
-                'translated_text': memory.translated_text,
-                'from_cache': 'database',
-                'confidence_score': memory.confidence_score or 0.9
-            }
-        except TranslationMemory.DoesNotExist:
+        memory = TranslationMemory.objects.filter(
+            source_text_hash=text_hash,
+            source_language=source_lang,
+            target_language=target_lang
+        ).only('translated_text', 'confidence_score').first()
+        if memory is None:
             return None
 
-    def _save_to_memory_cache(self, text: str, source_lang: str, target_lang: str,
-                             translated_text: str, confidence_score: float = None):
-        cache_key = f"translation:{source_lang}:{target_lang}:{hashlib.md5(text.encode()).hexdigest()}"
-        cache.set(cache_key, translated_text, timeout=3600)
+        # Incrément atomique côté base, sans relire ni réécrire la ligne
+        TranslationMemory.objects.filter(pk=memory.pk).update(usage_count=F('usage_count') + 1)
+        cache.set(cache_key, memory.translated_text, timeout=self.CACHE_TIMEOUT)
+        self._l1_set(l1_key, memory.translated_text, memory.confidence_score or 0.9)
+        logger.debug(f"Cache DB hit: {text_hash}")
+        return {
+            'translated_text': memory.translated_text,
+            'from_cache': 'database',
+            'confidence_score': memory.confidence_score or 0.9
+        }
 
-        text_hash = self._generate_text_hash(text, source_lang, target_lang)
-        TranslationMemory.objects.update_or_create(
-            source_text_hash=text_hash,
-            source_language=source_lang,
-            target_language=target_lang,
-            defaults={
-                'translated_text': translated_text,
-                'confidence_score': confidence_score,
-                'usage_count': 1,
-            }
+    def _save_to_memory_cache(self, text: str, source_lang: str, target_lang: str,
+                             translated_text: str, confidence_score: float = None,
+                             text_hash: Optional[str] = None):
+        text_hash = text_hash or self._generate_text_hash(text, source_lang, target_lang)
+        cache_key = f"translation:{source_lang}:{target_lang}:{text_hash}"
+        cache.set(cache_key, translated_text, timeout=self.CACHE_TIMEOUT)
+        self._l1_set(
+            (source_lang, target_lang, text), translated_text,
+            confidence_score if confidence_score is not None else 1.0
         )
 
+        # Les lectures passent d'abord par le cache : l'écriture en base peut
+        # être confiée à Celery quand il est disponible
+        if self.config['ASYNC_MEMORY_WRITES']:
+            from .tasks import persist_translation_memory
+            try:
+                persist_translation_memory.delay(
+                    text_hash, source_lang, target_lang, translated_text, confidence_score
+                )
+                return
+            except Exception as e:
+                logger.warning(f"Écriture différée impossible, écriture directe: {e}")
+
+        save_translation_memory(text_hash, source_lang, target_lang, translated_text, confidence_score)
+
     def _log_api_call(self, endpoint: str, source_lang: str, target_lang: str,
                      character_count: int, success: bool, response_time: float,
                      status_code: int = None, error_message: str = '', cost_estimate: float = None):
-        try:
-            APILog.objects.create(
-                endpoint=endpoint,
-                source_language=source_lang,
-                target_language=target_lang,
-                character_count=character_count,
-                success=success,
-                response_time=response_time,
-                status_code=status_code,
-                error_message=error_message[:2000],
-                cost_estimate=cost_estimate,
-            )
-        except Exception as e:
-            logger.error(f"Log API error: {e}")
+        _log_buffer.put({
+            'endpoint': endpoint,
+            'source_language': source_lang,
+            'target_language': target_lang,
+            'character_count': character_count,
+            'success': success,
+            'response_time': response_time,
+            'status_code': status_code,
+            'error_message': error_message[:2000],
+            'cost_estimate': cost_estimate,
+        })
 
     def _calculate_cost(self, input_tokens: int, output_tokens: int) -> float:
         INPUT_PRICE_PER_1K = 0.00014
@@ -158,56 +433,82 @@ class DeepSeekAPIClient:
         output_cost = (output_tokens / 1000) * OUTPUT_PRICE_PER_1K
         return input_cost + output_cost
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((requests.RequestException, DeepSeekAPIError)),
-        before_sleep=before_sleep_log(logger, logging.WARNING)
-    )
+    def _encode_payload(self, prompt: str) -> bytes:
+        # Corps JSON sérialisé une fois (orjson si disponible), réutilisé par les reprises
+        payload = {
+            'model': self.config['MODEL'],
+            'messages': [SYSTEM_MESSAGE, {'role': 'user', 'content': prompt}],
+            'temperature': self.config['TEMPERATURE'],
+            'max_tokens': self.config['MAX_TOKENS'],
+            'stream': False,
+        }
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(payload)
+        return json.dumps(payload).encode('utf-8')
+
+    def _post_with_retry(self, body: bytes) -> requests.Response:
+        """
+        Envoie la requête avec reprises exponentielles (2 s, 4 s... max 10 s)
+        sur erreur réseau ou statut non 200. La dernière réponse est retournée
+        telle quelle ; la dernière erreur réseau est relevée.
+        """
+        attempts = max(1, self.config['MAX_RETRIES'])
+        for attempt in range(1, attempts + 1):
+            self._wait_for_rate_limit()
+            try:
+                response = self.session.post(
+                    self.config['API_URL'],
+                    data=body,
+                    timeout=self.config['TIMEOUT']
+                )
+                if response.status_code == 200 or attempt == attempts:
+                    return response
+                logger.warning(f"API Error {response.status_code}, tentative {attempt}/{attempts}")
+            except requests.RequestException as e:
+                if attempt == attempts:
+                    raise
+                logger.warning(f"Network error: {e}, tentative {attempt}/{attempts}")
+            time.sleep(min(2 ** attempt, 10))
+
     def translate_text(self, text: str, source_lang: str, target_lang: str) -> Dict:
         start_time = time.time()
 
         if not text or not text.strip():
             raise ValueError("Texte vide")
+        if not _has_letters(text):
+            return {
+                'translated_text': text,
+                'from_cache': False,
+                'confidence_score': 1.0,
+            }
         if not self.api_key:
             raise DeepSeekAPIError("API key manquante")
 
-        cached_result = self._check_memory_cache(text, source_lang, target_lang)
+        # Empreinte calculée une seule fois pour la lecture et l'écriture du cache
+        text_hash = self._generate_text_hash(text, source_lang, target_lang)
+
+        cached_result = self._check_memory_cache(text, source_lang, target_lang, text_hash)
         if cached_result:
             logger.info(f"Cache: {source_lang}->{target_lang}")
             return cached_result
 
-        self._wait_for_rate_limit()
-        source_lang_name = self._get_language_name(source_lang)
-        target_lang_name = self._get_language_name(target_lang)
-
-        prompt = f"""Traduis de {source_lang_name} à {target_lang_name}.
-Conserve format, HTML, liens, nombres.
-Pas de modification noms propres, codes, emails, URLs.
+        # Texte trop long pour un appel : traduit par segments mis en cache séparément
+        if len(text) > self.config['MAX_CHARS_PER_CALL']:
+            parts = self._split_long_text(text)
+            if len(parts) > 1:
+                return self._translate_long_text(text, parts, source_lang, target_lang, text_hash)
 
-Texte:
-{text}
-
-Traduction en {target_lang_name}:"""
+        prompt = self.PROMPT_TEMPLATE.format(
+            src=self._get_language_name(source_lang),
+            tgt=self._get_language_name(target_lang),
+            text=text,
+        )
 
-        payload = {
-            'model': self.config['MODEL'],
-            'messages': [
-                {'role': 'system', 'content': 'Traducteur professionnel.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            'temperature': self.config['TEMPERATURE'],
-            'max_tokens': self.config['MAX_TOKENS'],
-            'stream': False,
-        }
+        body = self._encode_payload(prompt)
 
         try:
             logger.debug(f"API call: {source_lang}->{target_lang}, {len(text)} chars")
-            response = self.session.post(
-                self.config['API_URL'],
-                json=payload,
-                timeout=self.config['TIMEOUT']
-            )
+            response = self._post_with_retry(body)
             response_time = time.time() - start_time
 
             if response.status_code == 200:
@@ -221,7 +522,9 @@ Traduction en {target_lang_name}:"""
                 cost_estimate = self._calculate_cost(input_tokens, output_tokens)
                 confidence_score = self._calculate_confidence_score(text, translated_text)
 
-                self._save_to_memory_cache(text, source_lang, target_lang, translated_text, confidence_score)
+                self._save_to_memory_cache(
+                    text, source_lang, target_lang, translated_text, confidence_score, text_hash
+                )
 
                 self._log_api_call(
                     endpoint='translate',
@@ -249,7 +552,9 @@ Traduction en {target_lang_name}:"""
                     'response_time': response_time,
                 }
             else:
-                error_msg = f"API Error {response.status_code}: {response.text}"
+                # Extrait borné, sans décoder tout le corps de la réponse
+                snippet = response.content[:500].decode('utf-8', 'replace')
+                error_msg = f"API Error {response.status_code}: {snippet}"
                 logger.error(error_msg)
                 self._log_api_call(
                     endpoint='translate',
@@ -259,7 +564,7 @@ Traduction en {target_lang_name}:"""
                     success=False,
                     response_time=response_time,
                     status_code=response.status_code,
-                    error_message=response.text[:500],
+                    error_message=snippet,
                 )
                 raise DeepSeekAPIError(error_msg)
 
@@ -277,40 +582,287 @@ Traduction en {target_lang_name}:"""
             )
             raise DeepSeekAPIError(f"Network error: {e}")
 
-    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[Dict]:
+    def _split_long_text(self, text: str) -> List[str]:
+        """
+        Découpe un texte en segments et séparateurs alternés (indices pairs :
+        segments, impairs : séparateurs). Les paragraphes trop longs sont
+        redécoupés en phrases.
+        """
+        parts = []
+        for index, piece in enumerate(PARAGRAPH_SPLIT_RE.split(text)):
+            if index % 2 or len(piece) <= self.config['MAX_CHARS_PER_CALL']:
+                parts.append(piece)
+            else:
+                parts.extend(SENTENCE_SPLIT_RE.split(piece))
+        return parts
+
+    def _translate_long_text(self, text: str, parts: List[str], source_lang: str,
+                             target_lang: str, text_hash: str) -> Dict:
+        start_time = time.time()
+        indexes = [index for index in range(0, len(parts), 2) if parts[index].strip()]
+        logger.info(f"Texte long ({len(text)} chars): {len(indexes)} segments")
+
+        segments = [parts[index] for index in indexes]
+        if getattr(_worker_state, 'active', False):
+            # Déjà dans un thread du pool de translate_batch : segments traduits
+            # à la suite, sans second pool
+            results = [
+                self._translate_text_or_error(segment, source_lang, target_lang)
+                for segment in segments
+            ]
+        else:
+            results = self.translate_batch(segments, source_lang, target_lang)
+        errors = [result['error'] for result in results if result.get('error')]
+        if errors:
+            raise DeepSeekAPIError(f"Traduction segmentée incomplète: {errors[0]}")
+
+        translated_parts = list(parts)
+        for index, result in zip(indexes, results):
+            translated_parts[index] = result['translated_text']
+        translated_text = ''.join(translated_parts)
+
+        confidence_score = sum(result['confidence_score'] for result in results) / len(results)
+        self._save_to_memory_cache(
+            text, source_lang, target_lang, translated_text, confidence_score, text_hash
+        )
+
+        return {
+            'translated_text': translated_text,
+            'from_cache': False,
+            'confidence_score': confidence_score,
+            'segments': len(results),
+            'response_time': time.time() - start_time,
+        }
+
+    def _translate_batch_api(self, batch: List[str], source_lang: str, target_lang: str,
+                             text_hashes: Optional[List[str]] = None) -> Optional[List[Dict]]:
+        """
+        Traduit plusieurs textes d'une ligne en un seul appel API (liste numérotée).
+
+        Retourne None si l'appel échoue ou si la réponse ne peut pas être
+        découpée : l'appelant repasse alors texte par texte.
+        """
+        if not self.api_key:
+            return None
+
+        start_time = time.time()
+        self._wait_for_rate_limit()
+        numbered = '\n'.join(f"{number}. {text}" for number, text in enumerate(batch, 1))
+        character_count = sum(len(text) for text in batch)
+
+        prompt = self.BATCH_PROMPT_TEMPLATE.format(
+            src=self._get_language_name(source_lang),
+            tgt=self._get_language_name(target_lang),
+            numbered=numbered,
+        )
+
+        body = self._encode_payload(prompt)
+
+        try:
+            logger.debug(f"API batch call: {source_lang}->{target_lang}, {len(batch)} texts")
+            response = self.session.post(
+                self.config['API_URL'],
+                data=body,
+                timeout=self.config['TIMEOUT']
+            )
+        except requests.RequestException as e:
+            logger.error(f"Network error (batch): {e}")
+            self._log_api_call(
+                endpoint='translate_batch',
+                source_lang=source_lang,
+                target_lang=target_lang,
+                character_count=character_count,
+                success=False,
+                response_time=time.time() - start_time,
+                error_message=str(e),
+            )
+            return None
+
+        response_time = time.time() - start_time
+
+        if response.status_code != 200:
+            snippet = response.content[:500].decode('utf-8', 'replace')
+            logger.error(f"API Error {response.status_code} (batch): {snippet}")
+            self._log_api_call(
+                endpoint='translate_batch',
+                source_lang=source_lang,
+                target_lang=target_lang,
+                character_count=character_count,
+                success=False,
+                response_time=response_time,
+                status_code=response.status_code,
+                error_message=snippet,
+            )
+            return None
+
+        try:
+            result = response.json()
+            content = result['choices'][0]['message']['content']
+            translations = {
+                int(number): line.strip()
+                for number, line in BATCH_LINE_RE.findall(content)
+            }
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            logger.error(f"Réponse batch invalide: {e}")
+            self._log_api_call(
+                endpoint='translate_batch',
+                source_lang=source_lang,
+                target_lang=target_lang,
+                character_count=character_count,
+                success=False,
+                response_time=response_time,
+                status_code=response.status_code,
+                error_message=f"Invalid response: {e}",
+            )
+            return None
+        if set(translations) != set(range(1, len(batch) + 1)):
+            logger.warning(f"Réponse batch non exploitable ({len(translations)}/{len(batch)} lignes)")
+            return None
+
+        usage = result.get('usage', {})
+        cost_estimate = self._calculate_cost(
+            usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0)
+        )
+        self._log_api_call(
+            endpoint='translate_batch',
+            source_lang=source_lang,
+            target_lang=target_lang,
+            character_count=character_count,
+            success=True,
+            response_time=response_time,
+            status_code=response.status_code,
+            cost_estimate=cost_estimate
+        )
+        logger.info(f"Batch success: {source_lang}->{target_lang}, {len(batch)} texts, {response_time:.2f}s")
+
         results = []
+        for number, text in enumerate(batch, 1):
+            translated_text = self._clean_translation(translations[number], text)
+            confidence_score = self._calculate_confidence_score(text, translated_text)
+            self._save_to_memory_cache(
+                text, source_lang, target_lang, translated_text, confidence_score,
+                text_hashes[number - 1] if text_hashes else None
+            )
+            results.append({
+                'translated_text': translated_text,
+                'from_cache': False,
+                'confidence_score': confidence_score,
+                'response_time': response_time,
+            })
+        return results
+
+    @staticmethod
+    def _run_in_worker(func, *args):
+        # Les connexions ouvertes par un thread du pool sont fermées avec lui
+        _worker_state.active = True
+        try:
+            return func(*args)
+        finally:
+            _worker_state.active = False
+            connections.close_all()
+
+    def _translate_text_or_error(self, text: str, source_lang: str, target_lang: str) -> Dict:
+        try:
+            return self.translate_text(text, source_lang, target_lang)
+        except Exception as e:
+            logger.error(f"Batch error: {e}")
+            return {
+                'translated_text': text,
+                'from_cache': False,
+                'confidence_score': 0.0,
+                'error': str(e),
+                'success': False,
+            }
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[Dict]:
+        results = [None] * len(texts)
         batch_size = self.config.get('BATCH_SIZE', 5)
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            logger.info(f"Batch {i//batch_size + 1}: {len(batch)} texts")
+        # Les textes déjà en cache sont retirés avant l'appel puis réinsérés
+        pending = []
+        text_hashes = {}
+        for index, text in enumerate(texts):
+            if text and text.strip():
+                if not _has_letters(text):
+                    results[index] = self.translate_text(text, source_lang, target_lang)
+                    continue
+                text_hashes[index] = self._generate_text_hash(text, source_lang, target_lang)
+                cached_result = self._check_memory_cache(text, source_lang, target_lang, text_hashes[index])
+                if cached_result:
+                    results[index] = cached_result
+                    continue
+            pending.append(index)
+
+        # Textes multilignes, vides ou trop longs : traités un par un (liste
+        # numérotée impossible ou découpage nécessaire)
+        max_chars = self.config['MAX_CHARS_PER_CALL']
+        batchable = [
+            index for index in pending
+            if texts[index].strip() and '\n' not in texts[index] and len(texts[index]) <= max_chars
+        ]
+        batchable_set = set(batchable)
+        single = [index for index in pending if index not in batchable_set]
+
+        # Lots limités en nombre de textes et en caractères par appel
+        chunks = []
+        chunk = []
+        chunk_chars = 0
+        for index in batchable:
+            length = len(texts[index])
+            if chunk and (len(chunk) >= batch_size or chunk_chars + length > max_chars):
+                chunks.append(chunk)
+                chunk = []
+                chunk_chars = 0
+            chunk.append(index)
+            chunk_chars += length
+        if chunk:
+            chunks.append(chunk)
+        if not chunks and not single:
+            return results
+
+        # Appels réseau concurrents, cadencés par le seau à jetons (plus de pause fixe)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._run_in_worker, self._translate_batch_api,
+                    [texts[index] for index in chunk], source_lang, target_lang,
+                    [text_hashes[index] for index in chunk]
+                ): chunk
+                for chunk in chunks
+            }
+            futures.update({
+                executor.submit(
+                    self._run_in_worker, self._translate_text_or_error,
+                    texts[index], source_lang, target_lang
+                ): index
+                for index in single
+            })
+
+            for future in as_completed(futures):
+                target = futures[future]
+                if isinstance(target, int):
+                    results[target] = future.result()
+                    continue
 
-            for text in batch:
                 try:
-                    result = self.translate_text(text, source_lang, target_lang)
-                    results.append(result)
+                    translated = future.result()
                 except Exception as e:
-                    logger.error(f"Batch error: {e}")
-                    results.append({
-                        'translated_text': text,
-                        'from_cache': False,
-                        'confidence_score': 0.0,
-                        'error': str(e),
-                        'success': False,
-                    })
-
-            if i + batch_size < len(texts):
-                time.sleep(0.5)
+                    logger.error(f"Batch chunk failed: {e}")
+                    translated = None
+                if translated is None:
+                    # Réponse batch inexploitable : chaque texte repart seul
+                    for index in target:
+                        results[index] = self._translate_text_or_error(texts[index], source_lang, target_lang)
+                    continue
+                for index, result in zip(target, translated):
+                    results[index] = result
 
         return results
 
     def _clean_translation(self, translated_text: str, original_text: str) -> str:
-        lines = translated_text.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            if not any(marker in line.lower() for marker in ['traduction', 'translation', '```']):
-                cleaned_lines.append(line)
-        cleaned_text = '\n'.join(cleaned_lines).strip()
+        cleaned_text = '\n'.join(
+            line for line in translated_text.split('\n') if not CLEAN_MARKER_RE.search(line)
+        ).strip()
         return cleaned_text if cleaned_text else original_text
 
     def _calculate_confidence_score(self, original: str, translated: str) -> float:
@@ -321,10 +873,10 @@ Traduction en {target_lang_name}:"""
         trans_len = len(translated)
         length_ratio = min(trans_len / orig_len, orig_len / trans_len)
 
-        if '<' in original and '>' in original:
-            orig_tags = set(original.split('<')[1:])
-            trans_tags = set(translated.split('<')[1:])
-            tag_preservation = len(orig_tags & trans_tags) / max(len(orig_tags), 1)
+        orig_tags = frozenset(TAG_RE.findall(original)) if '<' in original else None
+        if orig_tags:
+            trans_tags = frozenset(TAG_RE.findall(translated))
+            tag_preservation = len(orig_tags & trans_tags) / len(orig_tags)
             score = (length_ratio * 0.6 + tag_preservation * 0.4)
         else:
             score = length_ratio
@@ -332,7 +884,7 @@ Traduction en {target_lang_name}:"""
         return min(max(score, 0.0), 1.0)
 
     def get_supported_languages(self) -> List[str]:
-        return list(self.LANGUAGE_MAP.keys())
+        return list(self.SUPPORTED_LANGUAGES)
 
     def test_connection(self) -> bool:
         try:
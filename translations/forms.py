@@ -237,13 +237,19 @@ class BatchTranslationForm(forms.Form):
     def clean_texts(self):
         """Valide et nettoie les textes."""
         texts = self.cleaned_data['texts']
-        lines = [line.strip() for line in texts.split('\n') if line.strip()]
 
-        if len(lines) > 100:
-            raise forms.ValidationError(_("Maximum 100 textes à la fois"))
+        # Un seul passage : nettoyage, comptage et longueur totale
+        lines = []
+        total_chars = 0
+        for raw_line in texts.split('\n'):
+            line = raw_line.strip()
+            if not line:
+                continue
+            lines.append(line)
+            total_chars += len(line)
+            if len(lines) > 100:
+                raise forms.ValidationError(_("Maximum 100 textes à la fois"))
 
-        # Vérifie la longueur totale
-        total_chars = sum(len(line) for line in lines)
         if total_chars > 10000:
             raise forms.ValidationError(_("Maximum 10,000 caractères au total"))
 
@@ -3,6 +3,7 @@ Middleware pour la détection automatique de la langue utilisateur
 et la gestion des préférences de traduction.
 """
 import logging
+import re
 from django.utils import translation
 from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
@@ -11,6 +12,32 @@ from .models import TranslationSettings
 
 logger = logging.getLogger(__name__)
 
+# Entrée du header Accept-Language : langue principale et poids q éventuel
+_ACCEPT_LANG_RE = re.compile(r'([a-zA-Z]{1,8})(?:-[a-zA-Z0-9]{1,8})*\s*(?:;\s*q=([01](?:\.\d+)?))?')
+
+
+def _load_supported_languages():
+    """
+    Langues supportées, lues une fois dans les settings au démarrage du middleware.
+    """
+    if hasattr(settings, 'DEEPSEEK_CONFIG'):
+        return tuple(settings.DEEPSEEK_CONFIG.get('ENABLED_LANGUAGES', [settings.LANGUAGE_CODE]))
+    return (settings.LANGUAGE_CODE,)
+
+
+def get_request_translation_settings(request, user=None):
+    """
+    Paramètres de traduction de l'utilisateur (ou globaux si user est None),
+    résolus au plus une fois par requête.
+    """
+    if not hasattr(request, '_translation_settings_cache'):
+        request._translation_settings_cache = {}
+    resolved = request._translation_settings_cache
+    user_id = user.pk if user is not None else None
+    if user_id not in resolved:
+        resolved[user_id] = TranslationSettings.objects.get_for_user(user)
+    return resolved[user_id]
+
 
 class LanguageDetectionMiddleware(MiddlewareMixin):
     """
@@ -23,6 +50,14 @@ class LanguageDetectionMiddleware(MiddlewareMixin):
     5. Langue par défaut du site
     """
 
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self._supported = _load_supported_languages()
+        self._supported_set = frozenset(self._supported)
+        self._url_lang_re = re.compile(
+            rf'^/({"|".join(map(re.escape, self._supported))})(?:/|$)'
+        )
+
     def process_request(self, request):
         # Langue depuis l'URL (si applicable)
         lang_from_url = self._get_language_from_url(request)
@@ -42,7 +77,7 @@ class LanguageDetectionMiddleware(MiddlewareMixin):
         # Langue depuis les préférences utilisateur
         if request.user.is_authenticated:
             try:
-                user_settings = TranslationSettings.objects.filter(user=request.user).first()
+                user_settings = get_request_translation_settings(request, request.user)
                 if user_settings and user_settings.preferred_languages:
                     user_lang = user_settings.preferred_languages[0]
                     if user_lang in self._get_supported_languages():
@@ -82,41 +117,30 @@ class LanguageDetectionMiddleware(MiddlewareMixin):
         """
         Extrait la langue depuis l'URL (support pour /fr/, /en/, etc.).
         """
-        path = request.path_info
-        if path.startswith('/'):
-            path = path[1:]
-
-        # Vérifie les préfixes de langue
-        for lang_code in self._get_supported_languages():
-            if path.startswith(f'{lang_code}/') or path == lang_code:
-                return lang_code
-
-        return None
+        match = self._url_lang_re.match(request.path_info)
+        return match.group(1) if match else None
 
     def _parse_accept_language(self, accept_language):
         """
-        Parse le header Accept-Language pour trouver la meilleure langue.
+        Parse le header Accept-Language pour trouver la meilleure langue
+        (poids q le plus élevé, puis ordre du header).
         """
-        languages = accept_language.split(',')
         supported = self._get_supported_languages()
+        best_lang, best_q = None, 0.0
 
-        for lang in languages:
-            try:
-                lang_code = lang.split(';')[0].strip().split('-')[0].lower()
-                if lang_code in supported:
-                    return lang_code
-            except:
-                continue
+        for match in _ACCEPT_LANG_RE.finditer(accept_language):
+            lang_code = match.group(1).lower()
+            q = float(match.group(2)) if match.group(2) else 1.0
+            if q > best_q and lang_code in supported:
+                best_lang, best_q = lang_code, q
 
-        return None
+        return best_lang
 
     def _get_supported_languages(self):
         """
-        Retourne la liste des langues supportées.
+        Retourne l'ensemble des langues supportées.
         """
-        if hasattr(settings, 'DEEPSEEK_CONFIG'):
-            return settings.DEEPSEEK_CONFIG.get('ENABLED_LANGUAGES', [settings.LANGUAGE_CODE])
-        return [settings.LANGUAGE_CODE]
+        return self._supported_set
 
 
 class TranslationPreferencesMiddleware(MiddlewareMixin):
@@ -124,6 +148,10 @@ class TranslationPreferencesMiddleware(MiddlewareMixin):
     Middleware pour gérer les préférences de traduction utilisateur.
     """
 
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self._supported = _load_supported_languages()
+
     def process_request(self, request):
         # Ajoute les préférences de traduction à l'objet request
         request.translation_preferences = self._get_user_preferences(request)
@@ -144,7 +172,7 @@ class TranslationPreferencesMiddleware(MiddlewareMixin):
 
         try:
             # Préférences globales
-            global_settings = TranslationSettings.objects.filter(user=None).first()
+            global_settings = get_request_translation_settings(request)
             if global_settings:
                 preferences.update({
                     'auto_translate': global_settings.auto_translate_enabled,
@@ -154,7 +182,7 @@ class TranslationPreferencesMiddleware(MiddlewareMixin):
 
             # Préférences utilisateur (si authentifié)
             if request.user.is_authenticated:
-                user_settings = TranslationSettings.objects.filter(user=request.user).first()
+                user_settings = get_request_translation_settings(request, request.user)
                 if user_settings:
                     preferences.update({
                         'auto_translate': user_settings.auto_translate_enabled,
@@ -183,6 +211,4 @@ class TranslationPreferencesMiddleware(MiddlewareMixin):
         """
         Retourne la liste des langues supportées.
         """
-        if hasattr(settings, 'DEEPSEEK_CONFIG'):
-            return settings.DEEPSEEK_CONFIG.get('ENABLED_LANGUAGES', [settings.LANGUAGE_CODE])
-        return [settings.LANGUAGE_CODE]
\ No newline at end of file
+        return list(self._supported)
\ No newline at end of file
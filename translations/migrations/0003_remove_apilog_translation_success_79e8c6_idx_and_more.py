@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("translations", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="apilog",
+            name="translation_success_79e8c6_idx",
+        ),
+        migrations.AddIndex(
+            model_name="apilog",
+            index=models.Index(
+                fields=["success", "created_at"], name="translation_success_601fdf_idx"
+            ),
+        ),
+    ]
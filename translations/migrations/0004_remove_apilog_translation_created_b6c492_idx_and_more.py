@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-18 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("translations", "0003_remove_apilog_translation_success_79e8c6_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="apilog",
+            name="translation_created_b6c492_idx",
+        ),
+        migrations.AddIndex(
+            model_name="apilog",
+            index=models.Index(
+                fields=["created_at", "success", "response_time"],
+                name="translation_created_f916ab_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-18 10:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("translations", "0004_remove_apilog_translation_created_b6c492_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="translationmemory",
+            name="translation_source__4e1ee6_idx",
+        ),
+        migrations.AlterField(
+            model_name="translationmemory",
+            name="source_text_hash",
+            field=models.CharField(max_length=64),
+        ),
+    ]
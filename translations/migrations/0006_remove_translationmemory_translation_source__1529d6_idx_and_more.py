@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-18 11:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("translations", "0005_remove_translationmemory_translation_source__4e1ee6_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="translationmemory",
+            name="translation_source__1529d6_idx",
+        ),
+        migrations.AddIndex(
+            model_name="translationmemory",
+            index=models.Index(
+                fields=["source_language", "target_language", "-usage_count"],
+                name="tm_lang_usage_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("translations", "0006_remove_translationmemory_translation_source__1529d6_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="translationmemory",
+            name="source_text_hash",
+            field=models.CharField(max_length=32),
+        ),
+    ]
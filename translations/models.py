@@ -2,20 +2,87 @@
 Modèles pour le système de traduction automatique multilingue.
 Stocke les traductions pour tout contenu textuel de l'application.
 """
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Func, Value
 from django.contrib.contenttypes.models import ContentType
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 from django.utils.translation import get_language_info
 import uuid
+from functools import lru_cache
 from django.contrib.contenttypes.fields import GenericForeignKey
 
+
+@lru_cache(maxsize=64)
+def _language_name(language_code):
+    # name_translated est paresseux : la traduction suit la langue active au rendu
+    try:
+        return get_language_info(language_code)['name_translated']
+    except KeyError:
+        # Code inconnu de Django : affiché tel quel
+        return language_code
+
+
+class JSONArrayAppend(Func):
+    """Ajoute une chaîne en fin de tableau JSON, directement en base"""
+    function = 'JSON_ARRAY_APPEND'
+    output_field = models.JSONField()
+
+    def __init__(self, expression, value, **extra):
+        super().__init__(expression, Value('$'), Value(value), **extra)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        column, _, value = self.get_source_expressions()
+        column_sql, column_params = compiler.compile(column)
+        value_sql, value_params = compiler.compile(value)
+        return f'({column_sql} || to_jsonb({value_sql}::text))', (*column_params, *value_params)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        column, _, value = self.get_source_expressions()
+        clone = self.copy()
+        clone.set_source_expressions([column, Value('$[#]'), value])
+        return clone.as_sql(compiler, connection, function='JSON_INSERT', **extra_context)
+
+
+class JSONArrayContains(Func):
+    """Vrai si le tableau JSON contient la chaîne, évalué par la base de données"""
+    function = 'JSON_CONTAINS'
+    output_field = models.BooleanField()
+
+    def __init__(self, expression, value, **extra):
+        super().__init__(expression, Value(value), **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        column, value = self.get_source_expressions()
+        column_sql, column_params = compiler.compile(column)
+        value_sql, value_params = compiler.compile(value)
+        return f'JSON_CONTAINS({column_sql}, JSON_QUOTE({value_sql}))', (*column_params, *value_params)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        column, value = self.get_source_expressions()
+        column_sql, column_params = compiler.compile(column)
+        value_sql, value_params = compiler.compile(value)
+        return f'({column_sql} @> to_jsonb({value_sql}::text))', (*column_params, *value_params)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        column, value = self.get_source_expressions()
+        column_sql, column_params = compiler.compile(column)
+        value_sql, value_params = compiler.compile(value)
+        return (
+            f'EXISTS (SELECT 1 FROM json_each({column_sql}) WHERE json_each.value = {value_sql})',
+            (*column_params, *value_params)
+        )
+
+
 class TranslationMemory(models.Model):
     """
     Mémoire de traduction pour stocker les paires source-traduction
     et réutiliser les traductions fréquentes.
     """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    source_text_hash = models.CharField(max_length=64, db_index=True)
+    # Empreinte MD5 hexadécimale : largeur fixe, clé d'index au plus juste
+    source_text_hash = models.CharField(max_length=32)
     source_language = models.CharField(max_length=10)
     target_language = models.CharField(max_length=10)
     translated_text = models.TextField()
@@ -26,10 +93,12 @@ class TranslationMemory(models.Model):
 
     class Meta:
         db_table = 'translation_memory'
+        # L'index unique sert aussi aux recherches par empreinte (préfixe gauche)
         unique_together = ['source_text_hash', 'source_language', 'target_language']
         indexes = [
-            models.Index(fields=['source_text_hash']),
-            models.Index(fields=['source_language', 'target_language']),
+            # Traductions les plus utilisées d'une paire de langues ; remplace
+            # l'index (source_language, target_language), dont il est le préfixe
+            models.Index(fields=['source_language', 'target_language', '-usage_count'], name='tm_lang_usage_idx'),
         ]
         verbose_name = 'Mémoire de traduction'
         verbose_name_plural = 'Mémoires de traduction'
@@ -104,27 +173,40 @@ class TranslationJob(models.Model):
         completed = len(self.completed_languages)
         return int((completed / total) * 100) if total > 0 else 0
 
+    def _transition(self, status, **timestamps):
+        # Changement de statut en un seul UPDATE, instance tenue à jour
+        self.status = status
+        for field_name, value in timestamps.items():
+            setattr(self, field_name, value)
+        TranslationJob.objects.filter(pk=self.pk).update(status=status, **timestamps)
+
     def mark_as_processing(self):
-        self.status = 'processing'
-        self.started_at = models.DateTimeField(auto_now=True)
-        self.save(update_fields=['status', 'started_at'])
+        self._transition('processing', started_at=timezone.now())
 
     def mark_as_completed(self):
-        self.status = 'completed'
-        self.completed_at = models.DateTimeField(auto_now=True)
-        self.save(update_fields=['status', 'completed_at'])
+        self._transition('completed', completed_at=timezone.now())
+
+    # Ajouts atomiques en base : deux workers qui terminent des langues
+    # différentes du même travail ne s'écrasent plus mutuellement, et la
+    # présence de la langue est vérifiée dans le WHERE de l'UPDATE (la copie
+    # en mémoire peut être périmée si un autre worker tient le même travail)
+    def _append_language(self, field_name, language_code, **updates):
+        TranslationJob.objects.filter(pk=self.pk).exclude(
+            JSONArrayContains(F(field_name), language_code)
+        ).update(**{field_name: JSONArrayAppend(F(field_name), language_code)}, **updates)
 
     def add_completed_language(self, language_code):
         if language_code not in self.completed_languages:
             self.completed_languages.append(language_code)
-            self.save(update_fields=['completed_languages'])
+            self._append_language('completed_languages', language_code)
 
     def add_failed_language(self, language_code, error=None):
         if language_code not in self.failed_languages:
             self.failed_languages.append(language_code)
+            updates = {}
             if error:
-                self.error_message = str(error)[:500]
-            self.save(update_fields=['failed_languages', 'error_message'])
+                self.error_message = updates['error_message'] = str(error)[:500]
+            self._append_language('failed_languages', language_code, **updates)
 
 
 class Translation(models.Model):
@@ -202,28 +284,79 @@ class Translation(models.Model):
     def __str__(self):
         return f"{self.field_name} ({self.language})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Texte chargé, pour détecter une nouvelle version sans relire la ligne
+        instance._loaded_translated_text = instance.__dict__.get('translated_text')
+        return instance
+
+    def _translated_text_changed(self, update_fields):
+        if self._state.adding:
+            return False
+        if update_fields is not None and 'translated_text' not in update_fields:
+            return False
+        # Champ différé et jamais assigné : inchangé
+        if 'translated_text' not in self.__dict__:
+            return False
+
+        loaded = getattr(self, '_loaded_translated_text', None)
+        if loaded is None:
+            loaded = Translation.objects.filter(pk=self.pk).values_list(
+                'translated_text', flat=True
+            ).first()
+        return loaded is not None and loaded != self.translated_text
+
     def save(self, *args, **kwargs):
         # Si c'est une nouvelle version, marquer l'ancienne comme non courante
-        if self.pk:
-            old = Translation.objects.get(pk=self.pk)
-            if old.translated_text != self.translated_text:
-                self.version = old.version + 1
-                Translation.objects.filter(
-                    content_type=self.content_type,
-                    object_id=self.object_id,
-                    field_name=self.field_name,
-                    language=self.language,
-                    is_current=True
-                ).update(is_current=False)
-                self.is_current = True
-        super().save(*args, **kwargs)
+        if not self._translated_text_changed(kwargs.get('update_fields')):
+            super().save(*args, **kwargs)
+            self._loaded_translated_text = self.__dict__.get('translated_text')
+            return
+
+        with transaction.atomic():
+            self.version += 1
+            Translation.objects.filter(
+                content_type_id=self.content_type_id,
+                object_id=self.object_id,
+                field_name=self.field_name,
+                language=self.language,
+                is_current=True
+            ).update(is_current=False)
+            self.is_current = True
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version', 'is_current'}
+            super().save(*args, **kwargs)
+        self._loaded_translated_text = self.translated_text
 
     @property
     def language_name(self):
-        try:
-            return get_language_info(self.language)['name_translated']
-        except:
-            return self.language
+        return _language_name(self.language)
+
+
+class CachedTranslationSettingsManager(models.Manager):
+    """
+    Accès aux paramètres de traduction avec un cache court par utilisateur
+    (invalidé par les signaux post_save / post_delete).
+    """
+    CACHE_TIMEOUT = 30
+
+    @staticmethod
+    def cache_key(user_id):
+        return f"tsettings:{user_id or 0}"
+
+    def get_for_user(self, user=None):
+        """
+        Retourne les paramètres de l'utilisateur (ou les paramètres globaux si
+        user est None), ou None s'il n'y en a pas.
+        """
+        user_id = user.pk if user is not None else None
+        return cache.get_or_set(
+            self.cache_key(user_id),
+            lambda: self.filter(user_id=user_id).first(),
+            self.CACHE_TIMEOUT,
+        )
 
 
 class TranslationSettings(models.Model):
@@ -268,6 +401,8 @@ class TranslationSettings(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CachedTranslationSettingsManager()
+
     class Meta:
         db_table = 'translation_settings'
         verbose_name = 'Paramètre de traduction'
@@ -298,8 +433,10 @@ class APILog(models.Model):
     class Meta:
         db_table = 'translation_api_logs'
         indexes = [
-            models.Index(fields=['created_at']),
-            models.Index(fields=['success']),
+            # Index couvrant pour les statistiques API des dernières 24h
+            models.Index(fields=['created_at', 'success', 'response_time']),
+            # Dernières erreurs (filter(success=False).order_by('-created_at'))
+            models.Index(fields=['success', 'created_at']),
             models.Index(fields=['source_language', 'target_language']),
         ]
         verbose_name = 'Log API'
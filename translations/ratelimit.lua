@@ -0,0 +1,32 @@
+-- Seau à jetons atomique pour le client DeepSeek
+-- KEYS[1] : clé du seau ; ARGV : maintenant (s), débit (jetons/s), capacité
+-- Retourne {1, "0"} si un jeton est pris, sinon {0, "<secondes avant le prochain jeton>"}
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+
+local bucket = redis.call('HMGET', key, 'tokens', 'last_refill')
+local tokens = tonumber(bucket[1])
+local last_refill = tonumber(bucket[2])
+if tokens == nil or last_refill == nil then
+    tokens = capacity
+    last_refill = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - last_refill) * rate)
+
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+
+redis.call('HSET', key, 'tokens', tokens, 'last_refill', now)
+redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+
+-- Les nombres Lua sont tronqués en entiers par Redis : attente renvoyée en chaîne
+return {allowed, tostring(wait)}
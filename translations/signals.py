@@ -3,7 +3,10 @@ Signaux pour la détection automatique des modifications de contenu
 et déclenchement des traductions.
 """
 import logging
-from django.db.models.signals import post_save, pre_save
+import re
+from functools import lru_cache
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver, Signal
 from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
@@ -29,27 +32,26 @@ def register_translatable_model(model_class, fields):
         model_class: Classe du modèle Django
         fields: Liste des noms de champs à traduire
     """
-    app_label = model_class._meta.app_label
-    model_name = model_class._meta.model_name
-    key = f"{app_label}.{model_name}"
+    # Clé "app_label.model_name", précalculée par Django
+    key = model_class._meta.label_lower
 
     _translatable_models[key] = {
         'model_class': model_class,
         'fields': fields,
-        'app_label': app_label,
-        'model_name': model_name,
+        'app_label': model_class._meta.app_label,
+        'model_name': model_class._meta.model_name,
     }
 
+    # Récepteur branché sur ce seul modèle : les autres sauvegardes du projet
+    # ne passent plus par auto_translate_on_save
+    post_save.connect(auto_translate_on_save, sender=model_class, dispatch_uid=f'auto_xlate_{key}')
+
     logger.info(f"Modèle enregistré pour traduction: {key} - Champs: {fields}")
 
 
 def get_translatable_fields_for_model(model_class):
     """Retourne les champs traduisibles d'un modèle."""
-    app_label = model_class._meta.app_label
-    model_name = model_class._meta.model_name
-    key = f"{app_label}.{model_name}"
-
-    return _translatable_models.get(key, {}).get('fields', [])
+    return _translatable_models.get(model_class._meta.label_lower, {}).get('fields', [])
 
 
 def should_translate_field(field_name, field_value):
@@ -82,6 +84,25 @@ def should_translate_field(field_name, field_value):
     return True
 
 
+# Mots communs par langue
+_LANG_INDICATORS = {
+    'fr': frozenset(['le', 'la', 'les', 'un', 'une', 'des', 'et', 'est']),
+    'en': frozenset(['the', 'a', 'an', 'and', 'is', 'are', 'to', 'of']),
+    'ar': frozenset(['ال', 'في', 'من', 'على', 'إلى', 'أن', 'كان']),
+    'es': frozenset(['el', 'la', 'los', 'las', 'un', 'una', 'y', 'es']),
+    'de': frozenset(['der', 'die', 'das', 'und', 'ist', 'sind', 'ein']),
+    'it': frozenset(['il', 'la', 'lo', 'gli', 'le', 'e', 'è', 'un']),
+    'pt': frozenset(['o', 'a', 'os', 'as', 'e', 'é', 'um', 'uma']),
+    'ru': frozenset(['и', 'в', 'не', 'на', 'я', 'он', 'с', 'что']),
+    'zh': frozenset(['的', '是', '在', '和', '了', '有', '我', '他']),
+    'tr': frozenset(['ve', 'bir', 'bu', 'şey', 'için', 'ama', 'gibi']),
+    'nl': frozenset(['de', 'het', 'een', 'en', 'is', 'van', 'op', 'te']),
+}
+
+_WORD_RE = re.compile(r'\w+')
+_CJK_CHAR_RE = re.compile(r'[\u4e00-\u9fff]')
+
+
 def detect_language(text):
     """
     Détecte la langue d'un texte (simplifié).
@@ -95,27 +116,16 @@ def detect_language(text):
     if not text or len(text) < 10:
         return settings.LANGUAGE_CODE
 
-    # Détection simplifiée
-    text_lower = text.lower()
-
-    # Mots communs par langue
-    language_indicators = {
-        'fr': ['le', 'la', 'les', 'un', 'une', 'des', 'et', 'est'],
-        'en': ['the', 'a', 'an', 'and', 'is', 'are', 'to', 'of'],
-        'ar': ['ال', 'في', 'من', 'على', 'إلى', 'أن', 'كان'],
-        'es': ['el', 'la', 'los', 'las', 'un', 'una', 'y', 'es'],
-        'de': ['der', 'die', 'das', 'und', 'ist', 'sind', 'ein'],
-        'it': ['il', 'la', 'lo', 'gli', 'le', 'e', 'è', 'un'],
-        'pt': ['o', 'a', 'os', 'as', 'e', 'é', 'um', 'uma'],
-        'ru': ['и', 'в', 'не', 'на', 'я', 'он', 'с', 'что'],
-        'zh': ['的', '是', '在', '和', '了', '有', '我', '他'],
-        'tr': ['ve', 'bir', 'bu', 'şey', 'için', 'ama', 'gibi'],
-        'nl': ['de', 'het', 'een', 'en', 'is', 'van', 'op', 'te'],
-    }
+    # Détection simplifiée : mots entiers, texte découpé une seule fois
+    tokens = set(_WORD_RE.findall(text.lower()))
+    # Le chinois s'écrit sans espaces et l'article arabe est collé au mot
+    tokens.update(_CJK_CHAR_RE.findall(text))
+    if any(token.startswith('ال') for token in tokens):
+        tokens.add('ال')
 
     scores = {}
-    for lang, words in language_indicators.items():
-        score = sum(1 for word in words if word in text_lower)
+    for lang, words in _LANG_INDICATORS.items():
+        score = len(words & tokens)
         if score > 0:
             scores[lang] = score
 
@@ -125,15 +135,16 @@ def detect_language(text):
     return settings.LANGUAGE_CODE
 
 
+@lru_cache(maxsize=32)
 def get_target_languages(source_language):
     """
-    Retourne la liste des langues cibles.
+    Retourne les langues cibles (calculées une fois par langue source).
 
     Args:
         source_language: Langue source
 
     Returns:
-        list: Codes des langues cibles
+        tuple: Codes des langues cibles
     """
     if hasattr(settings, 'DEEPSEEK_CONFIG'):
         enabled_languages = settings.DEEPSEEK_CONFIG.get('ENABLED_LANGUAGES', [])
@@ -141,41 +152,47 @@ def get_target_languages(source_language):
         enabled_languages = ['fr', 'en', 'ar', 'es', 'de', 'it', 'pt', 'ru', 'zh', 'tr', 'nl']
 
     # Retire la langue source
-    target_languages = [lang for lang in enabled_languages if lang != source_language]
-    return target_languages
+    return tuple(lang for lang in enabled_languages if lang != source_language)
 
 
-@receiver(post_save)
 def auto_translate_on_save(sender, instance, created, **kwargs):
     """
-    Déclenche la traduction automatique après sauvegarde.
+    Déclenche la traduction automatique après sauvegarde
+    (connecté par register_translatable_model).
     """
-    # Import paresseux pour éviter les imports circulaires
-    from .models import TranslationJob, Translation, TranslationSettings, APILog
-
-    # Évite les boucles infinies
-    if sender in [TranslationJob, Translation, TranslationSettings, APILog]:
-        return
-
     # Vérifie si le modèle est enregistré pour traduction
-    app_label = sender._meta.app_label
-    model_name = sender._meta.model_name
-    model_key = f"{app_label}.{model_name}"
-
-    if model_key not in _translatable_models:
+    model_key = sender._meta.label_lower
+    registration = _translatable_models.get(model_key)
+    if registration is None:
         return
 
+    # Import paresseux pour éviter les imports circulaires
+    from .models import TranslationJob, Translation, TranslationSettings
+
     # Vérifie si la traduction automatique est activée
     try:
-        global_settings = TranslationSettings.objects.filter(user=None).first()
+        global_settings = TranslationSettings.objects.get_for_user(None)
         if global_settings and not global_settings.auto_translate_enabled:
             logger.debug("Traduction automatique désactivée globalement")
             return
     except Exception as e:
         logger.warning(f"Erreur vérification paramètres globaux: {e}")
 
-    translatable_fields = _translatable_models[model_key]['fields']
+    translatable_fields = registration['fields']
+    content_type = ContentType.objects.get_for_model(sender)
+
+    # Champs déjà traduits, en une requête (inutile pour un nouvel objet)
+    if created:
+        already_translated = set()
+    else:
+        already_translated = set(Translation.objects.filter(
+            content_type=content_type,
+            object_id=str(instance.pk),
+            field_name__in=translatable_fields,
+            is_current=True
+        ).values_list('field_name', flat=True))
 
+    jobs = []
     for field_name in translatable_fields:
         if not hasattr(instance, field_name):
             continue
@@ -186,15 +203,7 @@ def auto_translate_on_save(sender, instance, created, **kwargs):
             continue
 
         # Vérifie si une traduction existe déjà
-        content_type = ContentType.objects.get_for_model(sender)
-        existing_translations = Translation.objects.filter(
-            content_type=content_type,
-            object_id=str(instance.pk),
-            field_name=field_name,
-            is_current=True
-        ).exists()
-
-        if existing_translations and not created:
+        if field_name in already_translated:
             logger.debug(f"Traductions existantes pour {model_key}.{field_name}")
             continue
 
@@ -206,26 +215,42 @@ def auto_translate_on_save(sender, instance, created, **kwargs):
             logger.debug(f"Aucune langue cible pour {source_language}")
             continue
 
-        try:
-            translation_job = TranslationJob.objects.create(
-                content_type=content_type,
-                object_id=str(instance.pk),
-                field_name=field_name,
-                original_text=field_value,
-                source_language=source_language,
-                target_languages=target_languages,
-                total_characters=len(field_value),
-                status='pending',
-            )
+        jobs.append(TranslationJob(
+            content_type=content_type,
+            object_id=str(instance.pk),
+            field_name=field_name,
+            original_text=field_value,
+            source_language=source_language,
+            target_languages=target_languages,
+            total_characters=len(field_value),
+            status='pending',
+        ))
 
-            logger.info(f"Travail créé: {translation_job.id} pour {model_key}.{field_name}")
+    if not jobs:
+        return
 
-            # Démarre le traitement asynchrone
-            from .tasks import process_translation_job
-            process_translation_job.delay(translation_job.id)
+    # Un seul INSERT pour tous les champs, une seule publication Celery
+    try:
+        TranslationJob.objects.bulk_create(jobs)
+        for translation_job in jobs:
+            logger.info(f"Travail créé: {translation_job.id} pour {model_key}.{translation_job.field_name}")
 
-        except Exception as e:
-            logger.error(f"Erreur création travail traduction: {e}")
+        # Démarre le traitement asynchrone
+        from celery import group
+        from .tasks import process_translation_job
+        group(process_translation_job.s(translation_job.id) for translation_job in jobs).apply_async()
+
+    except Exception as e:
+        logger.error(f"Erreur création travail traduction: {e}")
+
+
+@receiver(post_save, sender='translations.TranslationSettings')
+@receiver(post_delete, sender='translations.TranslationSettings')
+def invalidate_translation_settings_cache(sender, instance, **kwargs):
+    """
+    Invalide le cache des paramètres de traduction modifiés ou supprimés.
+    """
+    cache.delete(sender.objects.cache_key(instance.user_id))
 
 
 @receiver(translate_content_signal)
@@ -275,18 +300,8 @@ def manual_translation_trigger(sender, instance, field_name, **kwargs):
         logger.error(f"Erreur traduction manuelle: {e}")
 
 
-def get_content_translations(instance, field_name=None, language=None):
-    """
-    Récupère les traductions d'un contenu.
-
-    Args:
-        instance: Instance du modèle
-        field_name: Champ spécifique (optionnel)
-        language: Langue spécifique (optionnel)
-
-    Returns:
-        dict: Traductions organisées par champ et langue
-    """
+def _current_translations(instance, field_name=None, language=None):
+    """Queryset des traductions courantes d'un contenu."""
     # Import paresseux
     from .models import Translation
 
@@ -303,6 +318,26 @@ def get_content_translations(instance, field_name=None, language=None):
     if language:
         translations = translations.filter(language=language)
 
+    return translations
+
+
+def get_content_translations(instance, field_name=None, language=None):
+    """
+    Récupère les traductions d'un contenu.
+
+    Args:
+        instance: Instance du modèle
+        field_name: Champ spécifique (optionnel)
+        language: Langue spécifique (optionnel)
+
+    Returns:
+        dict: Traductions organisées par champ et langue
+    """
+    # Seules les colonnes restituées sont chargées (pas source_text)
+    translations = _current_translations(instance, field_name, language).only(
+        'field_name', 'language', 'translated_text', 'quality', 'confidence_score', 'created_at'
+    )
+
     result = {}
     for trans in translations:
         if trans.field_name not in result:
@@ -317,18 +352,25 @@ def get_content_translations(instance, field_name=None, language=None):
     return result
 
 
-def get_available_languages(instance, field_name=None):
+def get_available_languages(instance, field_name=None, translations=None):
     """
     Retourne les langues disponibles pour un contenu.
 
     Args:
         instance: Instance du modèle
         field_name: Champ spécifique (optionnel)
+        translations: Résultat de get_content_translations déjà obtenu (optionnel)
 
     Returns:
         list: Codes de langue disponibles
     """
-    translations = get_content_translations(instance, field_name)
+    if translations is None:
+        # Codes de langue seulement, sans instancier de modèle
+        return sorted(set(
+            _current_translations(instance, field_name).values_list('language', flat=True)
+        ))
+    if field_name:
+        translations = {field_name: translations.get(field_name, {})}
     languages = set()
 
     for field_data in translations.values():
@@ -10,7 +10,7 @@ from django.utils import timezone
 from django.conf import settings
 
 from .models import TranslationJob, Translation
-from .api import get_api_client
+from .api import get_api_client, save_translation_memory
 
 logger = logging.getLogger(__name__)
 
@@ -96,8 +96,8 @@ def process_translation_job(self, job_id):
         else:
             job.status = 'completed'
 
-        job.processing_time = timezone.now() - job.started_at
-        job.save()
+        job.processing_time = (timezone.now() - job.started_at).total_seconds()
+        job.save(update_fields=['status', 'error_message', 'processing_time', 'api_calls_count'])
 
         logger.info(f"Travail {job_id} terminé: {job.status}")
 
@@ -105,13 +105,13 @@ def process_translation_job(self, job_id):
         logger.error(f"Erreur traitement travail {job_id}: {e}")
         job.status = 'failed'
         job.error_message = str(e)[:500]
-        job.save()
+        job.save(update_fields=['status', 'error_message'])
 
         # Retry si nécessaire
         if job.retry_count < job.max_retries:
             job.retry_count += 1
             job.status = 'pending'
-            job.save()
+            job.save(update_fields=['status', 'retry_count'])
 
             # Reprogramme la tâche avec backoff
             delay = 60 * (2 ** job.retry_count)  # 2^n minutes
@@ -169,13 +169,21 @@ def retry_failed_jobs(max_retries=3):
     for job in failed_jobs:
         job.status = 'pending'
         job.retry_count += 1
-        job.save()
+        job.save(update_fields=['status', 'retry_count'])
         process_translation_job.delay(job.id)
 
     logger.info(f"Relance: {count} travaux échoués")
     return count
 
 
+@shared_task
+def persist_translation_memory(text_hash, source_lang, target_lang, translated_text, confidence_score=None):
+    """
+    Enregistre une traduction dans la mémoire de traduction (hors du chemin de la requête).
+    """
+    save_translation_memory(text_hash, source_lang, target_lang, translated_text, confidence_score)
+
+
 @shared_task
 def update_translation_cache():
     """